@@ -1,9 +1,17 @@
+import os
+
 import dash_bootstrap_components as dbc
 from dash import Dash, Input, Output, State, callback, dcc, html
 
 from pages import overview_detail, small_multiple
+from utils import artifact_bundle, background_jobs, registry, session_store
 
 _USER_STUDY_FLAG = False  # We remove some options for a user study
+# Every layout kind that a case study in the registry can use
+_DICT_LAYOUT_RETURN = {
+    "overview_detail": overview_detail._layout_return,
+    "small_multiple": small_multiple._layout_return,
+}
 dash_app = Dash(
     "Polar Diagrams Dashboard",
     external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.icons.FONT_AWESOME],
@@ -14,6 +22,19 @@ dash_app.css.config.serve_locally = True
 dash_app.scripts.config.serve_locally = True
 server = dash_app.server
 
+# Responses are compressed when POLAR_COMPRESS lists the algorithms in order
+# of preference, for example "br,gzip". Flask-Compress is only needed then
+_STRING_COMPRESS = os.environ.get("POLAR_COMPRESS", "")
+if _STRING_COMPRESS:
+    try:
+        from flask_compress import Compress
+    except ImportError as error:
+        raise ImportError(
+            "POLAR_COMPRESS needs Flask-Compress, install dash[compress]"
+        ) from error
+    server.config["COMPRESS_ALGORITHM"] = _STRING_COMPRESS.split(",")
+    Compress(server)
+
 layout_first_row = dbc.Row(
     [
         dbc.Col(
@@ -31,61 +52,22 @@ layout_first_row = dbc.Row(
                             options=[
                                 {
                                     "label": html.Span(
-                                        "1. Overview+Detail - Climate",
-                                        style={
-                                            "font-size": 20,
-                                            "padding-left": 12,
-                                        },
-                                    ),
-                                    "value": "climate",
-                                    "disabled": _USER_STUDY_FLAG,
-                                },
-                                {
-                                    "label": html.Span(
-                                        "2. Overview+Detail - Wine",
-                                        style={
-                                            "font-size": 20,
-                                            "padding-left": 12,
-                                        },
-                                    ),
-                                    "value": "wine",
-                                    "disabled": False,
-                                },
-                                {
-                                    "label": html.Span(
-                                        "3. Overview+Detail - ML with Training Time",
-                                        style={
-                                            "font-size": 20,
-                                            "padding-left": 12,
-                                        },
-                                    ),
-                                    "value": "ml",
-                                    "disabled": _USER_STUDY_FLAG,
-                                },
-                                {
-                                    "label": html.Span(
-                                        "4. Small Multiple - Gaussian Processes",
-                                        style={
-                                            "font-size": 20,
-                                            "padding-left": 12,
-                                        },
-                                    ),
-                                    "value": "gp",
-                                    "disabled": _USER_STUDY_FLAG,
-                                },
-                                {
-                                    "label": html.Span(
-                                        "5. Overview+Detail - Cluttered Wine",
+                                        dict_case_study["label"],
                                         style={
                                             "font-size": 20,
                                             "padding-left": 12,
                                         },
                                     ),
-                                    "value": "clutter",
-                                    "disabled": _USER_STUDY_FLAG,
-                                },
+                                    "value": dict_case_study["id"],
+                                    "disabled": _USER_STUDY_FLAG
+                                    and not dict_case_study["user_study"],
+                                }
+                                for dict_case_study in (
+                                    registry.list_case_studies()
+                                )
                             ],
-                            value="wine",  # Default value on initial view
+                            # Default value on initial view
+                            value=registry.string_default_case_study(),
                             labelStyle={
                                 "display": "flex",
                                 "align-items": "center",
@@ -327,31 +309,53 @@ layout_first_row = dbc.Row(
     style={"background-color": "lightgrey"},
 )
 
-dash_app.layout = dbc.Container(
-    [
-        layout_first_row,
-        dbc.Row(className="g-0", justify="center", id="row_main_content"),
-    ],
-    fluid=True,
+# The progress bar is only shown while a background job builds diagrams
+layout_progress_row = dbc.Row(
+    dbc.Progress(
+        id="progress-job",
+        value=0,
+        striped=True,
+        animated=True,
+        style={"height": 20, "padding": 0},
+    ),
+    id="row-progress-job",
+    className="g-0",
+    style={"display": "none"},
 )
 
+
+def _layout_serve():
+    # Every page load gets its own session id. Callbacks use it to find the
+    # session state on the server, whichever worker or thread they run on
+    return dbc.Container(
+        [
+            dcc.Store(
+                id="session-id",
+                storage_type="memory",
+                data=session_store.string_new_session_id(),
+            ),
+            layout_first_row,
+            layout_progress_row,
+            dbc.Row(className="g-0", justify="center", id="row_main_content"),
+        ],
+        fluid=True,
+    )
+
+
+dash_app.layout = _layout_serve
+
+# The validation layout only needs the component IDs of every page, so it is
+# built from compute-free skeletons instead of full dashboards
 dash_app.validation_layout = dbc.Container(
     [
+        dcc.Store(id="session-id", storage_type="memory"),
         layout_first_row,
+        layout_progress_row,
         dbc.Row(
-            [overview_detail._layout_return(False)],
-            className="g-0",
-            justify="center",
-            id="row_main_content",
-        ),
-        dbc.Row(
-            [overview_detail._layout_return(True)],
-            className="g-0",
-            justify="center",
-            id="row_main_content",
-        ),
-        dbc.Row(
-            [small_multiple._layout_return()],
+            [
+                *overview_detail._layout_skeleton(),
+                small_multiple._layout_skeleton(),
+            ],
             className="g-0",
             justify="center",
             id="row_main_content",
@@ -361,46 +365,40 @@ dash_app.validation_layout = dbc.Container(
 )
 
 
-@callback(
+# Figures baked by precompute.py are used when the bundle matches the current
+# data and code, otherwise every view is computed live
+dict_bundle_views = artifact_bundle.dict_read_bundle()
+overview_detail._import_bundle_views(
+    dict_bundle_views.get("overview_detail", [])
+)
+small_multiple._import_bundle_views(
+    dict_bundle_views.get("small_multiple", [])
+)
+
+
+@background_jobs.callback(
     Output("row_main_content", "children"),
     Output("main_title", "children"),
     Output("selected-diagram-type", "value"),
     Input("radio_button", "value"),
+    State("session-id", "data"),
+    # Choosing another case study triggers this callback again, which
+    # already cancels its running job
+    bool_cancel_on_case_study=False,
 )
-def display_main_content(string_button_value):
-    if string_button_value == "climate":
-        return (
-            overview_detail._layout_return(0),
-            "Case Study - Climate",
-            "taylor",
-        )
-    elif string_button_value == "wine":
-        return (
-            overview_detail._layout_return(1),
-            "Case Study - Wine",
-            "mid scaled",
-        )  # Default value on initial view
-    elif string_button_value == "ml":
-        return (
-            overview_detail._layout_return(2),
-            "Case Study - ML with Training Time",
-            "taylor",
-        )
-    elif string_button_value == "gp":
-        return (
-            small_multiple._layout_return(),
-            "Case Study - Gaussian Processes",
-            "taylor",
-        )
-    elif string_button_value == "clutter":
-        return (
-            overview_detail._layout_return(3),
-            "Case Study - Cluttered Wine",
-            "mid scaled",
-        )
-    else:
+def display_main_content(string_button_value, string_session_id):
+    dict_case_study = registry.dict_get_case_study(string_button_value)
+    if dict_case_study is None:
         return "404"
 
+    return (
+        _DICT_LAYOUT_RETURN[dict_case_study["layout"]](
+            string_button_value, string_session_id
+        ),
+        dict_case_study["title"],
+        dict_case_study["diagram"],
+    )
+
 
 @callback(
     Output("offcanvas", "is_open", allow_duplicate=True),
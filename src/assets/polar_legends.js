@@ -0,0 +1,168 @@
+// Legend clicks only flip the visibility of traces that are already in the
+// browser, so they are handled here instead of on the server
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    polar_legends: {
+        // One legend click gives the following restyleData:
+        // [{"visible": ["legendonly"]}, [10]]
+        // [{"visible": [true]}, [1]]
+        // A group click gives one visibility for every trace index:
+        // [{"visible": ["legendonly", true, ...]}, [0, 1, ...]]
+        // An empty legend click gives no visibility at all:
+        // [{}, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]]
+        _listVisibleTraces: function (listLegendPoints) {
+            if (
+                !listLegendPoints ||
+                !listLegendPoints[0] ||
+                !listLegendPoints[0].visible
+            ) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+
+            return listLegendPoints[1].map(function (intLegendPoint, intI) {
+                return [
+                    intLegendPoint,
+                    listLegendPoints[0].visible[intI] === true,
+                ];
+            });
+        },
+
+        // The 1D projections have one trace per measure with a point per
+        // model, whose values are kept in customdata. Hidden models get a
+        // null x value. A packed detail diagram lists the models of each of
+        // its traces in the layout meta. The visibility of every clicked
+        // trace is also kept in a store, which the server reads on the next
+        // zoom or selection
+        sync_projections: function (
+            listLegendPoints,
+            dictLeftProjections,
+            dictLegendVisible,
+        ) {
+            const dictNamespace = window.dash_clientside.polar_legends;
+            const listTraceVisible =
+                dictNamespace._listVisibleTraces(listLegendPoints);
+            const dictLegendResult = Object.assign({}, dictLegendVisible);
+            listTraceVisible.forEach(function (listOne) {
+                dictLegendResult[listOne[0]] = listOne[1];
+            });
+            if (!dictLeftProjections || !dictLeftProjections.data) {
+                return [dictLeftProjections, dictLegendResult];
+            }
+            const dictMeta =
+                (dictLeftProjections.layout &&
+                    dictLeftProjections.layout.meta) ||
+                {};
+
+            const dictResult = Object.assign({}, dictLeftProjections);
+            dictResult.data = dictLeftProjections.data.map(function (dictOne) {
+                const listX = dictOne.x.slice();
+                listTraceVisible.forEach(function (listOne) {
+                    const listModels = dictMeta.list_trace_models
+                        ? dictMeta.list_trace_models[listOne[0]]
+                        : [listOne[0]];
+                    listModels.forEach(function (intModel) {
+                        listX[intModel] = listOne[1]
+                            ? dictOne.customdata[intModel]
+                            : null;
+                    });
+                });
+
+                return Object.assign({}, dictOne, { x: listX });
+            });
+
+            return [dictResult, dictLegendResult];
+        },
+
+        // Dash gives components with dictionary ids the JSON of that
+        // dictionary, with sorted keys, as their DOM id
+        _stringDomId: function (dictId) {
+            return (
+                "{" +
+                Object.keys(dictId)
+                    .sort()
+                    .map(function (stringKey) {
+                        return (
+                            JSON.stringify(stringKey) +
+                            ":" +
+                            JSON.stringify(dictId[stringKey])
+                        );
+                    })
+                    .join(",") +
+                "}"
+            );
+        },
+
+        // A legend click in any small multiple is applied to all others with
+        // Plotly.restyle, which only receives the clicked traces, so no
+        // figure passes through Dash. Charts that already show the clicked
+        // visibility are left alone, which also ends the restyle events
+        // that the synchronized charts raise in turn
+        sync_small_multiples: function (listRestyleData) {
+            const dictNamespace = window.dash_clientside.polar_legends;
+            const dictContext = window.dash_clientside.callback_context;
+            const listInputs = dictContext.inputs_list[0];
+            const stringTriggered = dictContext.triggered[0].prop_id;
+            const stringSource = stringTriggered.slice(
+                0,
+                stringTriggered.lastIndexOf("."),
+            );
+            const intSource = listInputs.findIndex(function (dictOne) {
+                return dictNamespace._stringDomId(dictOne.id) === stringSource;
+            });
+            const listLegendPoints = listRestyleData[intSource];
+            if (
+                !listLegendPoints ||
+                !listLegendPoints[0] ||
+                listLegendPoints[0].visible === undefined
+            ) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            const listTraces = listLegendPoints[1];
+            const listVisible = listTraces.map(function (intTrace, intI) {
+                return Array.isArray(listLegendPoints[0].visible)
+                    ? listLegendPoints[0].visible[intI]
+                    : listLegendPoints[0].visible;
+            });
+
+            listInputs.forEach(function (dictOne, intI) {
+                const divChart =
+                    intI !== intSource &&
+                    document.getElementById(
+                        dictNamespace._stringDomId(dictOne.id),
+                    );
+                const divPlot =
+                    divChart && divChart.querySelector(".js-plotly-plot");
+                if (!divPlot || !divPlot.data) {
+                    return;
+                }
+
+                const listChanged = [];
+                listTraces.forEach(function (intTrace, intJ) {
+                    const dictTrace = divPlot.data[intTrace];
+                    if (
+                        dictTrace &&
+                        (dictTrace.visible === undefined
+                            ? true
+                            : dictTrace.visible) !== listVisible[intJ]
+                    ) {
+                        listChanged.push(intJ);
+                    }
+                });
+                if (listChanged.length) {
+                    window.Plotly.restyle(
+                        divPlot,
+                        {
+                            visible: listChanged.map(function (intJ) {
+                                return listVisible[intJ];
+                            }),
+                        },
+                        listChanged.map(function (intJ) {
+                            return listTraces[intJ];
+                        }),
+                    );
+                }
+            });
+
+            throw window.dash_clientside.PreventUpdate;
+        },
+    },
+});
@@ -0,0 +1,219 @@
+import argparse
+import contextlib
+import io
+import statistics
+import time
+
+from pages import overview_detail
+from utils import diagnostics, figure_payload, session_store
+
+# Every diagram type and MID variant offered by the "Select diagram" dropdown
+_LIST_VIEWS = [("taylor", None), ("mid", "scaled"), ("mid", "normalized")]
+_LIST_STAGES = ["measures", "overview", "detail", "view state", "styling"]
+_LIST_FIGURES = ["overview", "size legend", "projections", "detail"]
+
+
+def _dict_time_stages(string_case_study, string_diagram_type, string_mid_type):
+    # The stages follow overview_detail._tuple_create_both_diagrams, each one
+    # timed on its own
+    (
+        df_input,
+        string_reference_model,
+        string_dataset,
+        dict_mi_parameters,
+    ) = overview_detail._tuple_get_case_study(string_case_study)
+    dict_seconds = {}
+
+    float_start = time.perf_counter()
+    with diagnostics.collect() as list_measure_warnings:
+        (
+            list_df_measures,
+            list_relevant_measures,
+        ) = overview_detail._tuple_calculate_measures(
+            df_input,
+            string_reference_model,
+            string_diagram_type,
+            string_mid_type,
+            dict_mi_parameters,
+        )
+    dict_seconds["measures"] = time.perf_counter() - float_start
+
+    float_start = time.perf_counter()
+    # The DBSCAN analysis is printed on every run, which we do not time
+    with contextlib.redirect_stdout(io.StringIO()):
+        (
+            chart_left,
+            _,
+            dict_cluster_index,
+            float_max_distance,
+            tuple_dbscan_parameters,
+        ) = overview_detail._tuple_create_initial_left_diagram(
+            list_df_measures[0],
+            list_relevant_measures,
+            string_reference_model,
+            string_dataset,
+            string_diagram_type,
+            string_mid_type,
+        )
+    dict_seconds["overview"] = time.perf_counter() - float_start
+
+    float_start = time.perf_counter()
+    (
+        chart_right,
+        chart_left_1d_projections,
+        _,
+    ) = overview_detail._tuple_create_initial_right_diagram(
+        list_df_measures,
+        list_relevant_measures,
+        string_reference_model,
+        string_diagram_type,
+        string_mid_type,
+        list_measure_warnings,
+    )
+    dict_seconds["detail"] = time.perf_counter() - float_start
+
+    float_start = time.perf_counter()
+    dict_view_state = overview_detail._dict_create_view_state(
+        chart_left,
+        chart_left_1d_projections,
+        chart_right,
+        dict_cluster_index,
+        float_max_distance,
+        tuple_dbscan_parameters,
+    )
+    dict_seconds["view state"] = time.perf_counter() - float_start
+
+    float_start = time.perf_counter()
+    overview_detail._tuple_style_both_diagrams(
+        chart_left,
+        chart_left_1d_projections,
+        chart_right,
+        dict_view_state,
+    )
+    dict_seconds["styling"] = time.perf_counter() - float_start
+
+    return dict_seconds
+
+
+def _print_payload(string_case_study, int_budget_bytes):
+    # The figures are measured the way the page sends them, after the level
+    # of detail and the payload encoding of the POLAR_PAYLOAD_* variables
+    string_session_id = session_store.string_new_session_id()
+    print(
+        "Bytes per figure of the "
+        + string_case_study
+        + " case study, as JSON / gzip"
+    )
+    print(
+        f"{'view':<16}"
+        + "".join(f"{i:>22}" for i in _LIST_FIGURES + ["total"])
+    )
+    for string_diagram_type, string_mid_type in _LIST_VIEWS:
+        string_view = string_diagram_type + (
+            " " + string_mid_type if string_mid_type else ""
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            tuple_diagrams = overview_detail._tuple_create_session_diagrams(
+                string_session_id,
+                string_case_study,
+                string_diagram_type,
+                string_mid_type,
+            )
+        list_bytes = [
+            figure_payload.tuple_figure_bytes(dict_figure)
+            for dict_figure in tuple_diagrams[:4]
+        ]
+        list_bytes.append(
+            (
+                sum(i[0] for i in list_bytes),
+                sum(i[1] for i in list_bytes),
+            )
+        )
+        print(
+            f"{string_view:<16}"
+            + "".join(f"{i[0]} / {i[1]}".rjust(22) for i in list_bytes)
+            + (
+                "  over the budget of " + str(int_budget_bytes)
+                if list_bytes[-1][1] > int_budget_bytes
+                else ""
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time every stage of building the overview and detail "
+        + "diagrams of one case study, for every diagram type, or report "
+        + "the bytes of its figures."
+    )
+    parser.add_argument(
+        "--case-study",
+        default="clutter",
+        help="Id of the case study in the registry (default: clutter).",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of timed runs per diagram type, after one warm-up run "
+        + "that fills the property cache (default: 5).",
+    )
+    parser.add_argument(
+        "--payload",
+        action="store_true",
+        help="Report the bytes of every figure sent to the browser instead "
+        + "of timing the stages.",
+    )
+    parser.add_argument(
+        "--budget",
+        type=int,
+        default=512 * 1024,
+        help="Compressed bytes all figures of one view may take together, "
+        + "used with --payload (default: 524288).",
+    )
+    args = parser.parse_args()
+
+    if args.payload:
+        _print_payload(args.case_study, args.budget)
+        return
+
+    print(
+        "Median milliseconds over "
+        + str(args.repeat)
+        + " runs of the "
+        + args.case_study
+        + " case study"
+    )
+    print(
+        f"{'view':<16}" + "".join(f"{i:>12}" for i in _LIST_STAGES + ["total"])
+    )
+    for string_diagram_type, string_mid_type in _LIST_VIEWS:
+        string_view = string_diagram_type + (
+            " " + string_mid_type if string_mid_type else ""
+        )
+        _dict_time_stages(
+            args.case_study, string_diagram_type, string_mid_type
+        )
+        list_runs = [
+            _dict_time_stages(
+                args.case_study, string_diagram_type, string_mid_type
+            )
+            for _ in range(args.repeat)
+        ]
+
+        list_medians = [
+            statistics.median(dict_run[string_stage] for dict_run in list_runs)
+            * 1000
+            for string_stage in _LIST_STAGES
+        ]
+        list_medians.append(
+            statistics.median(sum(dict_run.values()) for dict_run in list_runs)
+            * 1000
+        )
+        print(
+            f"{string_view:<16}" + "".join(f"{i:>12.1f}" for i in list_medians)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import argparse
+
+from utils import columnar, registry
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert the case study CSV files into memory-mapped "
+        + "columnar files that the dashboard loads instead of parsing text."
+    )
+    parser.parse_args()
+
+    # Only the files of the case studies in the registry are converted
+    for path_csv in registry.list_all_paths():
+        if columnar.bool_convert_csv(path_csv):
+            print("Converted " + path_csv)
+        else:
+            print("Skipped " + path_csv + " (non-numeric columns)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,39 @@
 import os
-import warnings
 
 import dash_bootstrap_components as dbc
 import numpy as np
 import pandas as pd
+import plotly.colors
 import plotly.graph_objects as go
 import polar_diagrams
-from dash import Input, Output, Patch, State, callback, dcc, html
+from dash import (
+    ClientsideFunction,
+    Input,
+    Output,
+    Patch,
+    State,
+    callback,
+    clientside_callback,
+    dcc,
+    html,
+)
 from dash.exceptions import PreventUpdate
 from plotly.subplots import make_subplots
-from sklearn.cluster import DBSCAN
 from sklearn.neighbors import NearestNeighbors
 
+from utils import (
+    background_jobs,
+    cluster_graph,
+    diagnostics,
+    diagram_builder,
+    figure_payload,
+    figure_spec,
+    polar_selection,
+    property_cache,
+    registry,
+    session_store,
+)
+
 _INT_CHART_WIDTH = 1400
 _INT_CHART_HEIGHT = 500
 _STR_COLOR_SELECTION_GREY = "#D3D3D3"
@@ -21,21 +43,45 @@ _DICT_FIGURE_SAVE_CONFIG = {
     "filename": "polar_diagram",
     "scale": 6,  # Multiply title/legend/axis/canvas sizes by this factor
 }
-_DICT_MI_PARAMETERS = dict(
-    string_entropy_method="auto",
-    int_mi_n_neighbors=3,
-    bool_discrete_reference_model=True,
-    discrete_models=True,
-    int_random_state=42,
-)
-_FLOAT_MAX_R = 0.0
-_FLOAT_MAX_THETA = 0.0
-_FLOAT_MAX_DISTANCE = 0.0  # This is either CRMSE, VI, or RVI
-_DICT_CLUSTER_MODEL = {}
-_LIST_MODEL_NAMES = []
-_STRING_REFERENCE_MODEL = "Ground_Truth"
 _STRING_DIAGRAM_TYPE = "mid"  # Default value on initial view
 _STRING_MID_TYPE = "scaled"  # Default value on initial view
+# Above this number of models the detail diagram packs all models into a few
+# WebGL traces instead of drawing one SVG trace per model
+_INT_WEBGL_MODEL_THRESHOLD = int(
+    os.environ.get("POLAR_WEBGL_MODEL_THRESHOLD", "1000")
+)
+# Above this number of models a packed detail diagram first shows only one
+# representative per cluster, and the members of a cluster are sent when the
+# user zooms into its region of the overview or selects its representative
+_INT_LOD_MODEL_THRESHOLD = int(
+    os.environ.get("POLAR_LOD_MODEL_THRESHOLD", "10000")
+)
+_STRING_REPRESENTATIVE_SYMBOL = "diamond"
+# The epsilon slider of the overview goes up to this multiple of the epsilon
+# that was found automatically
+_FLOAT_MAX_EPS_FACTOR = 2.0
+# Above this number of models, or when the neighbors of all models within the
+# largest epsilon would not fit into the graph cache, the overview clusters
+# grid cells instead of models. Epsilon is then estimated from a sample of the
+# models. The accuracy of that trade-off is measured on a sample of the same
+# size
+_INT_SCALABLE_MODEL_THRESHOLD = int(
+    os.environ.get("POLAR_SCALABLE_CLUSTER_THRESHOLD", "50000")
+)
+_INT_CLUSTER_SAMPLE_SIZE = int(
+    os.environ.get("POLAR_CLUSTER_SAMPLE_SIZE", "10000")
+)
+# Finished figures per (case study, diagram type, MID type, reference model)
+_CACHE_FIGURES = background_jobs.cache_create(
+    "overview_detail_figures",
+    int(os.environ.get("POLAR_FIGURE_CACHE_ENTRIES", "32")),
+)
+# Measure tables per shown diagram, which the DBSCAN sliders cluster again
+_CACHE_MEASURES = background_jobs.cache_create(
+    "overview_detail_measures",
+    int(os.environ.get("POLAR_MEASURE_CACHE_ENTRIES", "32")),
+)
+_DICT_BUNDLE_FIGURES = {}
 
 
 def _auto_dbscan(X, string_dataset, string_measure):
@@ -45,6 +91,15 @@ def _auto_dbscan(X, string_dataset, string_measure):
     # Dynamic k: standard heuristic
     int_k = max(2, min(2 * int_n_dims - 1, int(np.log(int_n_samples))))
 
+    # Large model sets only use a sample. Its k-distances are larger than the
+    # ones of all models, by the root of the sampling ratio in every dimension
+    float_density_scale = 1.0
+    if int_n_samples > _INT_SCALABLE_MODEL_THRESHOLD:
+        X = X.sample(n=_INT_CLUSTER_SAMPLE_SIZE, random_state=0)
+        float_density_scale = (_INT_CLUSTER_SAMPLE_SIZE / int_n_samples) ** (
+            1 / int_n_dims
+        )
+
     nbrs = NearestNeighbors(n_neighbors=int_k).fit(X)
     distances, _ = nbrs.kneighbors(X)
     k_distances = np.sort(distances[:, int_k - 1])
@@ -52,7 +107,7 @@ def _auto_dbscan(X, string_dataset, string_measure):
     # Elbow detection
     np_diffs = np.diff(k_distances)
     elbow_idx = np.argmax(np.diff(np_diffs)) + 1
-    float_eps = k_distances[elbow_idx]
+    float_eps = k_distances[elbow_idx] * float_density_scale
 
     int_min_pts = int_k
 
@@ -69,6 +124,7 @@ def _grid_search(
     string_dataset,
     string_reference_model,
     list_measures,
+    tuple_dbscan_parameters=None,
 ):
 
     # We save the row with the reference model
@@ -81,15 +137,55 @@ def _grid_search(
         list_measures
     ]
 
-    float_eps, int_min_samples = _auto_dbscan(
-        df_input_no_reference, string_dataset, list_measures[1]
-    )
+    # The sliders of the overview give epsilon and minPts, otherwise we find
+    # them automatically and cluster with plain DBSCAN. The first slider event
+    # computes the neighbor graph up to the largest epsilon of the slider, so
+    # every later one only thresholds it
+    bool_graph = tuple_dbscan_parameters is not None
+    if tuple_dbscan_parameters is None:
+        float_eps, int_min_samples = _auto_dbscan(
+            df_input_no_reference, string_dataset, list_measures[1]
+        )
+        float_max_eps = float_eps * _FLOAT_MAX_EPS_FACTOR
+    else:
+        float_eps, int_min_samples, float_max_eps = tuple_dbscan_parameters
 
-    constructor_DBSCAN = DBSCAN(
-        eps=float_eps, min_samples=int_min_samples, n_jobs=-1
-    )
-    constructor_DBSCAN.fit_predict(df_input_no_reference)
-    list_labels = list(constructor_DBSCAN.labels_)
+    # Very large model sets are clustered on a grid, whose accuracy against
+    # the exact clustering is reported together with the DBSCAN analysis
+    np_points = df_input_no_reference.to_numpy(dtype=float)
+    if np_points.shape[0] > _INT_SCALABLE_MODEL_THRESHOLD or (
+        not cluster_graph.bool_graph_fits(np_points, float_max_eps)
+    ):
+        np_labels = cluster_graph.np_grid_dbscan_labels(
+            np_points,
+            min(float_eps, float_max_eps),
+            int_min_samples,
+            float_max_eps,
+            bool_graph=bool_graph,
+        )
+        if tuple_dbscan_parameters is None:
+            float_accuracy, int_sample_size = (
+                cluster_graph.tuple_grid_accuracy(
+                    np_points,
+                    float_eps,
+                    int_min_samples,
+                    float_max_eps,
+                    _INT_CLUSTER_SAMPLE_SIZE,
+                )
+            )
+            print(
+                " Scalable mode: adjusted Rand index against exact DBSCAN on "
+                f"{int_sample_size} sampled models = {float_accuracy:.3f}\n"
+            )
+    else:
+        np_labels = cluster_graph.np_dbscan_labels(
+            np_points,
+            min(float_eps, float_max_eps),
+            int_min_samples,
+            float_max_eps,
+            bool_graph=bool_graph,
+        )
+    list_labels = list(np_labels)
 
     # We add the label for the reference model at the same place that model
     # was before we removed the entire row it was contained in
@@ -97,56 +193,88 @@ def _grid_search(
     # of any cluster
     list_labels.insert(df_reference_row.index.values[0], df_left_input.shape[0])
 
-    return list_labels
+    return list_labels, (
+        float(float_eps),
+        int(int_min_samples),
+        float(float_max_eps),
+    )
 
 
 def _tuple_group_left_dataframe(df_left_input, string_reference_model):
-    dict_aggregate_rules = {"Model": "; ".join}
+    # Every model gets the number of its cluster, and the members of all
+    # clusters are kept in one array with offsets into it. The measures of a
+    # cluster are averaged from those numbers, so grouping stays linear in
+    # the number of models and never builds strings of model names
+    np_model_clusters, np_offsets, np_members = (
+        cluster_graph.tuple_cluster_index(df_left_input["Label"].to_numpy())
+    )
+    np_counts = np.diff(np_offsets)
+
+    # The code below names only Clusters those traces that are different
+    # than the reference model, which never shares its cluster
+    list_cluster_names = [
+        "Cluster " + str(int_i + 1) for int_i in range(np_counts.shape[0])
+    ]
+    np_model_names = df_left_input["Model"].to_numpy()
+    for int_model in np_members[np_offsets[:-1]][np_counts == 1]:
+        if np_model_names[int_model] == string_reference_model:
+            list_cluster_names[np_model_clusters[int_model]] = (
+                string_reference_model
+            )
+
+    df_grouped_rows = pd.DataFrame(
+        {
+            "Label": df_left_input["Label"].to_numpy()[
+                np_members[np_offsets[:-1]]
+            ],
+            "Model": list_cluster_names,
+        }
+    )
     for i in df_left_input.columns.to_list():
         if i not in ["Model", "Label"]:
-            dict_aggregate_rules[i] = "mean"
+            df_grouped_rows[i] = (
+                np.bincount(
+                    np_model_clusters,
+                    weights=df_left_input[i].to_numpy(dtype=float),
+                    minlength=np_counts.shape[0],
+                )
+                / np_counts
+            )
+    df_grouped_rows["Cluster Count"] = np_counts
 
-    df_grouped_rows = (
-        df_left_input
-        .groupby("Label", as_index=False, sort=False)
-        .agg(dict_aggregate_rules)
-        .reset_index(drop=True)
-    )
-    df_grouped_rows["Cluster Count"] = [
-        int_i.count("; ") + 1 for int_i in list(df_grouped_rows["Model"])
-    ]
+    dict_cluster_index = {
+        "list_model_names": np_model_names.tolist(),
+        "list_cluster_names": list_cluster_names,
+        "np_model_clusters": np_model_clusters,
+    }
 
-    dict_model_cluster_correspondence = {}
-    list_new_model_names = []
-    for int_i, str_model in enumerate(df_grouped_rows["Model"].to_list()):
-        # The code below names only Clusters those traces that have multiple
-        # model names. If there is only one model name, then it is left as is
-        # and not named 'Cluster number'
-        # if '; ' in str_model:
-        #    list_new_model_names.append('Cluster ' + str(int_i + 1))
-        # else:
-        #    list_new_model_names.append(str_model)
-
-        # The code below names only Clusters those traces that are different
-        # than the reference model
-        if string_reference_model == str_model:
-            list_new_model_names.append(str_model)
-        else:
-            list_new_model_names.append("Cluster " + str(int_i + 1))
+    return df_grouped_rows, dict_cluster_index
 
-        for str_one_model in str_model.split("; "):
-            if str_one_model == string_reference_model:
-                dict_model_cluster_correspondence[str_one_model] = (
-                    string_reference_model
-                )
-            else:
-                dict_model_cluster_correspondence[str_one_model] = (
-                    "Cluster " + str(int_i + 1)
-                )
 
-    df_grouped_rows["Model"] = list_new_model_names
+def _dict_align_cluster_index(dict_cluster_index, list_model_names):
+    # The detail diagram orders its models differently than the measure
+    # table, so the index is aligned with that order once by name. The result
+    # is stored in the view state, so it only holds lists
+    np_model_clusters = dict_cluster_index["np_model_clusters"][
+        pd.Index(dict_cluster_index["list_model_names"]).get_indexer(
+            list_model_names
+        )
+    ]
+    int_n_clusters = len(dict_cluster_index["list_cluster_names"])
+    np_offsets = np.zeros(int_n_clusters + 1, dtype=int)
+    np.cumsum(
+        np.bincount(np_model_clusters, minlength=int_n_clusters),
+        out=np_offsets[1:],
+    )
 
-    return df_grouped_rows, dict_model_cluster_correspondence
+    return {
+        "list_cluster_names": dict_cluster_index["list_cluster_names"],
+        "list_model_clusters": np_model_clusters.tolist(),
+        "list_cluster_offsets": np_offsets.tolist(),
+        "list_cluster_models": np.argsort(
+            np_model_clusters, kind="stable"
+        ).tolist(),
+    }
 
 
 def _chart_create_left_chart(
@@ -166,10 +294,16 @@ def _chart_create_left_chart(
     )
     string_relevant_measure = list_relevant_measures[-1]
 
+    # The figure is styled as a plain dictionary, see utils/figure_spec.py
     int_max_cluster = df_grouped_data["Cluster Count"].max()
-    dict_left = chart_left.to_dict()
+    dict_left = figure_spec.dict_figure(chart_left)
     for int_i in range(len(dict_left["data"])):
         dict_left["data"][int_i]["showlegend"] = False
+        dict_left["data"][int_i]["marker"]["coloraxis"] = "coloraxis"
+        figure_spec.dict_update(
+            dict_left["data"][int_i]["marker"],
+            {"line": {"coloraxis": "coloraxis", "reversescale": True}},
+        )
 
         if (
             dict_left["data"][int_i]["name"].split(". ")[1]
@@ -193,12 +327,6 @@ def _chart_create_left_chart(
         # https://stackoverflow.com/questions/57417164/is-there-a-way-to-calculate-optimal-sizeref-value-for-plotly-scatter3d
         dict_left["data"][int_i]["marker"]["sizeref"] = int_max_cluster / 30**2
 
-    chart_left = go.Figure(dict_left).update_traces(
-        marker_coloraxis="coloraxis",
-        marker_line_coloraxis="coloraxis",
-        marker_line_reversescale=True,
-    )
-
     float_cmin = df_grouped_data[
         df_grouped_data["Model"] != string_reference_model
     ][string_relevant_measure].min()
@@ -209,70 +337,71 @@ def _chart_create_left_chart(
         * 1.15
     )
 
-    chart_left.update_layout(
-        coloraxis={
-            "colorscale": "gray",
-            "showscale": False,
-            "cmin": float_cmin,
-            "cmax": float_cmax,
+    # Named color scales are resolved by plotly.py, not by plotly.js
+    figure_spec.dict_update(
+        dict_left["layout"],
+        {
+            "coloraxis": {
+                "colorscale": plotly.colors.get_colorscale("gray"),
+                "showscale": False,
+                "cmin": float_cmin,
+                "cmax": float_cmax,
+            },
+            "dragmode": "zoom",
+            "clickmode": "event+select",
+            "hovermode": False,
         },
-        dragmode="zoom",
-        clickmode="event+select",
-        hovermode=False,
     )
 
     list_legend_ticks = list(df_grouped_data["Cluster Count"].unique())
 
-    chart_left_size_legend = go.Figure(
-        go.Scatter(
-            x=df_grouped_data["Cluster Count"],
-            y=[1] * df_grouped_data.shape[0],
-            showlegend=False,
-            marker={
-                "size": df_grouped_data["Cluster Count"],
-                "sizemode": "area",
-                "sizeref": df_grouped_data["Cluster Count"].max() / 30**2,
-                "color": "rgba(100,100,100,0)",
-                "line": {"color": "black", "width": 2},
+    dict_left_size_legend = {
+        "data": [
+            {
+                "type": "scatter",
+                "x": df_grouped_data["Cluster Count"].tolist(),
+                "y": [1] * df_grouped_data.shape[0],
+                "showlegend": False,
+                "marker": {
+                    "size": df_grouped_data["Cluster Count"].tolist(),
+                    "sizemode": "area",
+                    "sizeref": df_grouped_data["Cluster Count"].max() / 30**2,
+                    "color": "rgba(100,100,100,0)",
+                    "line": {"color": "black", "width": 2},
+                },
+            }
+        ],
+        "layout": {
+            "yaxis": {
+                "zeroline": False,
+                "showline": False,
+                "showticklabels": False,
+                "ticks": "",
+                "showgrid": False,
             },
-        )
-    )
-    chart_left_size_legend.update_layout(
-        yaxis={
-            "zeroline": False,
-            "showline": False,
-            "showticklabels": False,
-            "ticks": "",
-            "showgrid": False,
-        },
-        xaxis={
-            "zeroline": False,
-            "tickmode": "array",
-            "showgrid": False,
-            "tickvals": list_legend_ticks,
-            "title": "Cluster size",
-            "linecolor": _STR_COLOR_SELECTION_GREY,
+            "xaxis": {
+                "zeroline": False,
+                "tickmode": "array",
+                "showgrid": False,
+                "tickvals": list_legend_ticks,
+                "title": {"text": "Cluster size"},
+                "linecolor": _STR_COLOR_SELECTION_GREY,
+            },
+            "template": figure_spec.dict_template("simple_white"),
+            "dragmode": False,
+            "hovermode": False,
+            "width": round(_INT_CHART_WIDTH / 3.3),
+            "height": 110,
+            "margin": {"r": 50, "l": 130, "t": 0, "b": 0},
         },
-        template="simple_white",
-        dragmode=False,
-        hovermode=False,
-        width=round(_INT_CHART_WIDTH / 3.3),
-        height=110,
-        margin={"r": 50, "l": 130, "t": 0, "b": 0},
-    )
+    }
 
-    return chart_left, chart_left_size_legend
+    return dict_left, dict_left_size_legend
 
 
-def _tuple_create_initial_left_diagram(
-    df_input,
-    string_reference_model,
-    string_dataset,
-    string_diagram_type,
-    string_mid_type,
-):
-    # Here we create a DataFrame for the left chart with the clustered models
-    # First we check if this is a list
+def _df_measured_input(df_input):
+    # The measures are only estimated on the first data set, so first we
+    # check if this is a list
     if isinstance(df_input, list):
         # If so, we then check if we have a second version or scalar data set
         if len(df_input) != 2:
@@ -282,7 +411,7 @@ def _tuple_create_initial_left_diagram(
             )
         else:
             if df_input[1].shape[0] == 1:
-                df_new_input = df_input[0].copy()
+                df_new_input = df_input[0]
             else:
                 raise ValueError(
                     "The dashboard does not support two version"
@@ -294,35 +423,76 @@ def _tuple_create_initial_left_diagram(
     else:
         df_new_input = df_input
 
-    if string_diagram_type == "taylor":
-        df_left_input = polar_diagrams.df_calculate_td_properties(
-            df_new_input, string_reference_model
-        )
-        list_relevant_measures = ["Standard Deviation", "Correlation", "CRMSE"]
-    else:
-        df_left_input = polar_diagrams.df_calculate_mid_properties(
+    return df_new_input
+
+
+def _tuple_calculate_measures(
+    df_input,
+    string_reference_model,
+    string_diagram_type,
+    string_mid_type,
+    dict_mi_parameters,
+):
+    # Here we calculate the measures of all models once. The resulting table
+    # is used for clustering, for the detail diagram and for the 1D projections
+    list_df_measures = []
+    df_new_input = _df_measured_input(df_input)
+
+    # Property tables are content addressed, so switching back to a diagram
+    # type or reopening a case study does not estimate the measures again
+    list_df_measures.append(
+        property_cache.df_calculate_properties(
             df_new_input,
             string_reference_model,
-            dict_mi_parameters=_DICT_MI_PARAMETERS,
+            string_diagram_type,
+            dict_mi_parameters=dict_mi_parameters,
         )
-        if string_mid_type == "scaled":
-            list_relevant_measures = ["Entropy", "Scaled MI", "VI"]
-        else:
-            list_relevant_measures = ["Root Entropy", "Normalized MI", "RVI"]
+    )
 
-    global _FLOAT_MAX_DISTANCE
-    _FLOAT_MAX_DISTANCE = df_left_input[list_relevant_measures[-1]].max() + 0.1
+    # The scalar data set is encoded using the marker size, so we only reshape
+    # it the same way the polar_diagrams library does
+    if isinstance(df_input, list):
+        list_df_measures.append(
+            df_input[1]
+            .melt()
+            .rename(columns={"variable": "Model", "value": "Scalar"})
+        )
 
-    np_array_labels = _grid_search(
+    if string_diagram_type == "taylor":
+        list_relevant_measures = ["Standard Deviation", "Correlation", "CRMSE"]
+    elif string_mid_type == "scaled":
+        list_relevant_measures = ["Entropy", "Scaled MI", "VI"]
+    else:
+        list_relevant_measures = ["Root Entropy", "Normalized MI", "RVI"]
+
+    return list_df_measures, list_relevant_measures
+
+
+def _tuple_create_initial_left_diagram(
+    df_measures,
+    list_relevant_measures,
+    string_reference_model,
+    string_dataset,
+    string_diagram_type,
+    string_mid_type,
+    tuple_dbscan_parameters=None,
+):
+    # Here we create a DataFrame for the left chart with the clustered models
+    df_left_input = df_measures.copy()
+
+    float_max_distance = df_left_input[list_relevant_measures[-1]].max() + 0.1
+
+    np_array_labels, tuple_dbscan_parameters = _grid_search(
         df_left_input,
         string_dataset,
         string_reference_model=string_reference_model,
         list_measures=list_relevant_measures,
+        tuple_dbscan_parameters=tuple_dbscan_parameters,
     )
 
     df_left_input["Label"] = np_array_labels
 
-    df_left_grouped, dict_model_cluster = _tuple_group_left_dataframe(
+    df_left_grouped, dict_cluster_index = _tuple_group_left_dataframe(
         df_left_input, string_reference_model
     )
 
@@ -334,91 +504,73 @@ def _tuple_create_initial_left_diagram(
         list_relevant_measures,
     )
 
-    return chart_left, chart_left_size_legend, dict_model_cluster
+    return (
+        chart_left,
+        chart_left_size_legend,
+        dict_cluster_index,
+        float_max_distance,
+        tuple_dbscan_parameters,
+    )
 
 
-def _tuple_create_initial_right_diagram(
-    df_input, string_reference_model, string_diagram_type, string_mid_type
-):
+def _list_create_warning_components(list_warning_messages):
+    list_warnings = []
+    for string_one_warning in list_warning_messages:
+        list_warnings += [
+            html.I(
+                className="fa-solid fa-triangle-exclamation",
+                style={"margin-top": 3},
+            ),
+            string_one_warning,
+            html.Br(),
+        ]
 
-    list_warning_caught = None
-    # We monkey patch the function that prints the warnings so that it doesn't
-    # require some inputs and only returns the warning message that we need
-    warnings.formatwarning = lambda msg, *args, **kwargs: str(msg)
+    return list_warnings
 
-    if string_diagram_type == "mid":
-        if string_mid_type == "scaled":
-            list_relevant_measures = ["Entropy", "Scaled MI", "VI"]
-        else:
-            list_relevant_measures = ["Root Entropy", "Normalized MI", "RVI"]
-        with warnings.catch_warnings(record=True) as warning_tmp:
-            # Cause all warnings to always be triggered.
-            warnings.simplefilter("default")
-            chart_right = polar_diagrams.chart_create_mi_diagram(
-                df_input,
-                string_reference_model=string_reference_model,
-                string_mid_type=string_mid_type,
-                dict_mi_parameters=_DICT_MI_PARAMETERS,
-            ).update_layout(
-                dragmode="select",
-                clickmode="event+select",
-                width=int(_INT_CHART_WIDTH * 0.9),
-                height=_INT_CHART_HEIGHT * 1.3,
-                margin={"l": 0, "r": 0},
-            )
 
-            list_warning_caught = warning_tmp
-    else:
-        list_relevant_measures = ["Standard Deviation", "Correlation", "CRMSE"]
-        with warnings.catch_warnings(record=True) as warning_tmp:
-            # Cause all warnings to always be triggered.
-            warnings.simplefilter("default")
-            chart_right = polar_diagrams.chart_create_taylor_diagram(
-                df_input, string_reference_model=string_reference_model
-            ).update_layout(
-                dragmode="select",
-                clickmode="event+select",
-                width=int(_INT_CHART_WIDTH * 0.9),
-                height=_INT_CHART_HEIGHT * 1.3,
-                margin={"l": 0, "r": 0},
+def _tuple_create_initial_right_diagram(
+    list_df_measures,
+    list_relevant_measures,
+    string_reference_model,
+    string_diagram_type,
+    string_mid_type,
+    list_measure_warnings,
+):
+    with diagnostics.collect() as list_diagram_warnings:
+        chart_right = figure_spec.dict_figure(
+            diagram_builder.chart_create_diagram(
+                list_df_measures,
+                string_reference_model,
+                string_diagram_type,
+                string_mid_type,
+                # Detail diagrams that are packed anyway are built from a
+                # template trace, in linear time
+                bool_template=(
+                    list_df_measures[0].shape[0] > _INT_WEBGL_MODEL_THRESHOLD
+                ),
             )
+        )
+    figure_spec.dict_update(
+        chart_right["layout"],
+        {
+            "dragmode": "select",
+            "clickmode": "event+select",
+            "width": int(_INT_CHART_WIDTH * 0.9),
+            "height": _INT_CHART_HEIGHT * 1.3,
+            "margin": {"l": 0, "r": 0},
+        },
+    )
 
-            list_warning_caught = warning_tmp
-
-    list_warnings = []
-    int_i = 1
-    for warning_tmp in list_warning_caught:
-        if "RuntimeWarning" in warnings.formatwarning(warning_tmp):
-            string_one_warning = (
-                " "
-                + warnings
-                .formatwarning(warning_tmp)[11:]
-                .split(").")[0]
-                .replace("\\n", " ")
-                + ")."
+    # Warnings raised while estimating the measures are shown together with
+    # the ones raised while building the diagram
+    list_warnings = _list_create_warning_components(
+        [
+            " " + string_message
+            for string_message in diagnostics.list_runtime_messages(
+                list(list_measure_warnings) + list_diagram_warnings
             )
-            if string_one_warning in list_warnings:
-                continue
-            else:
-                list_warnings += [
-                    html.I(
-                        className="fa-solid fa-triangle-exclamation",
-                        style={"margin-top": 3},
-                    ),
-                    string_one_warning,
-                    html.Br(),
-                ]
-                int_i += 1
-
-    global _FLOAT_MAX_R
-    global _FLOAT_MAX_THETA
-    global _LIST_MIN_MAX_ANGULAR
-    _FLOAT_MAX_R = chart_right["layout"]["polar"]["radialaxis"]["range"][1]
-    _FLOAT_MAX_THETA = chart_right["layout"]["polar"]["sector"][1]
-    _LIST_MIN_MAX_ANGULAR = [
-        chart_right["layout"]["polar"]["angularaxis"]["ticktext"][0] - 0.1,
-        chart_right["layout"]["polar"]["angularaxis"]["ticktext"][-1] + 0.1,
-    ]
+        ]
+    )
 
     # We need this to have readable Cartesian axis titles
     dict_human_readable_measures = {
@@ -439,55 +591,312 @@ def _tuple_create_initial_right_diagram(
             )
         else:
             list_1d_projections_titles.append(string_relevant_measure)
-    # Creating a vertically stacked chart of 1d projections for all measures
-    chart_left_1d_projections = make_subplots(
-        rows=3,
-        cols=1,
-        subplot_titles=list_1d_projections_titles,
-        vertical_spacing=0.4,
+    # Creating a vertically stacked chart of 1d projections for all measures.
+    # Only its empty layout comes from plotly, the traces are added as they are
+    chart_left_1d_projections = figure_spec.dict_figure(
+        make_subplots(
+            rows=3,
+            cols=1,
+            subplot_titles=list_1d_projections_titles,
+            vertical_spacing=0.4,
+        )
     )
 
     # We traverse the diagram and capture the colors of each model
-    # This is needed for connecting the 1D projections with the diagram
-    dict_right = chart_right.to_dict()
-    for int_i in range(len(dict_right["data"])):
-        str_model_name = dict_right["data"][int_i]["name"].split(". ")[1]
-        dict_marker = dict_right["data"][int_i]["marker"]
-        float_r_value = dict_right["data"][int_i]["customdata"][0][1]
-        float_theta_value = dict_right["data"][int_i]["customdata"][0][2]
-        float_distance = dict_right["data"][int_i]["customdata"][0][3]
-
-        list_single_model_measures = [
-            float_r_value,
-            float_theta_value,
-            float_distance,
-        ]
-        for int_i, string_one_measure in enumerate(list_single_model_measures):
-            chart_left_1d_projections.add_trace(
-                go.Scatter(
-                    name=str_model_name,
-                    x=[string_one_measure],
-                    y=[0],
-                    legendgroup=str_model_name,
-                    showlegend=False,
-                    mode="markers",
-                    marker=dict_marker,
-                    hoverlabel=dict(
-                        bgcolor="rgb(255,255,255)",
-                        bordercolor=dict_marker["color"],
-                        font=dict(color="rgb(0,0,0)"),
-                    ),
-                    hoverinfo="x",
-                ),
-                row=int_i + 1,
-                col=1,
+    # This is needed for connecting the 1D projections with the diagram.
+    # Every measure is one trace holding a point per model, in the same
+    # order as the traces of the detail diagram
+    list_markers = []
+    list_list_projection_x = [[], [], []]
+    for dict_one_trace in chart_right["data"]:
+        list_markers.append(dict_one_trace["marker"])
+        # These are the radial value, the angular value and the distance
+        for int_j in range(3):
+            list_list_projection_x[int_j].append(
+                dict_one_trace["customdata"][0][int_j + 1]
             )
 
+    list_colors = [
+        _value_first_point(dict_marker.get("color"))
+        for dict_marker in list_markers
+    ]
+    dict_marker = {
+        "color": list_colors,
+        "size": [
+            _value_first_point(dict_marker.get("size"))
+            for dict_marker in list_markers
+        ],
+        "symbol": [
+            _value_first_point(dict_marker.get("symbol")) or "circle"
+            for dict_marker in list_markers
+        ],
+        "line": {
+            "color": [
+                _value_first_point(dict_marker.get("line", {}).get("color"))
+                for dict_marker in list_markers
+            ],
+            "width": list_markers[0].get("line", {}).get("width"),
+        },
+    }
+    for int_j, list_projection_x in enumerate(list_list_projection_x):
+        # The customdata keeps every value, so hidden models (with x set to
+        # None) can be shown again by the legend callback in the browser
+        chart_left_1d_projections["data"].append(
+            {
+                "type": "scatter",
+                "name": list_1d_projections_titles[int_j],
+                "x": list_projection_x,
+                "y": [0] * len(list_projection_x),
+                "customdata": list_projection_x,
+                "showlegend": False,
+                "mode": "markers",
+                "marker": dict_marker,
+                "hoverlabel": {
+                    "bgcolor": "rgb(255,255,255)",
+                    "bordercolor": list_colors,
+                    "font": {"color": "rgb(0,0,0)"},
+                },
+                "hoverinfo": "x",
+                "xaxis": "x" + (str(int_j + 1) if int_j > 0 else ""),
+                "yaxis": "y" + (str(int_j + 1) if int_j > 0 else ""),
+            }
+        )
+
     return chart_right, chart_left_1d_projections, list_warnings
 
 
+def _dict_create_view_state(
+    chart_left,
+    chart_left_1d_projections,
+    chart_right,
+    dict_cluster_index,
+    float_max_distance,
+    tuple_dbscan_parameters,
+):
+    # The view state holds everything the zoom callback and the artifact
+    # bundle need to know about the diagrams. It is passed around explicitly
+    # and stored per session, so concurrent renders never share it
+    dict_polar = chart_right["layout"]["polar"]
+    dict_view_state = {
+        "float_max_r": dict_polar["radialaxis"]["range"][1],
+        "float_max_theta": dict_polar["sector"][1],
+        # This is either CRMSE, VI, or RVI
+        "float_max_distance": float(float_max_distance),
+        "list_min_max_angular": [
+            dict_polar["angularaxis"]["ticktext"][0] - 0.1,
+            dict_polar["angularaxis"]["ticktext"][-1] + 0.1,
+        ],
+        # Epsilon, minPts and the largest epsilon of the clustering
+        "list_dbscan_parameters": list(tuple_dbscan_parameters),
+        "list_model_names": [
+            dict_one_trace["name"].split(". ")[1]
+            for dict_one_trace in chart_right["data"]
+        ],
+        # The selection callbacks only need the coordinates of every model
+        # and the number of overview traces, so they never receive the figures
+        "list_model_r": [
+            float(dict_one_trace["r"][0])
+            for dict_one_trace in chart_right["data"]
+        ],
+        "list_model_theta": [
+            float(dict_one_trace["theta"][0])
+            for dict_one_trace in chart_right["data"]
+        ],
+        "list_model_distance": [
+            float(dict_one_trace["customdata"][0][3])
+            for dict_one_trace in chart_right["data"]
+        ],
+        # The values shown in the three 1D projections, one list per measure
+        "list_projection_x": [
+            list(dict_one_trace["customdata"])
+            for dict_one_trace in chart_left_1d_projections["data"]
+        ],
+        "int_left_traces": len(chart_left["data"]),
+    }
+    # The cluster of every model and the models of every cluster
+    dict_view_state.update(
+        _dict_align_cluster_index(
+            dict_cluster_index, dict_view_state["list_model_names"]
+        )
+    )
+    dict_view_state["bool_packed"] = (
+        len(dict_view_state["list_model_names"]) > _INT_WEBGL_MODEL_THRESHOLD
+    )
+    if dict_view_state["bool_packed"]:
+        # Every cluster becomes one packed trace, so the reference model,
+        # which never shares its cluster, keeps its own trace
+        dict_view_state["list_trace_names"] = dict_view_state[
+            "list_cluster_names"
+        ]
+        list_offsets = dict_view_state["list_cluster_offsets"]
+        dict_view_state["list_trace_models"] = [
+            dict_view_state["list_cluster_models"][int_start:int_end]
+            for int_start, int_end in zip(list_offsets, list_offsets[1:])
+        ]
+
+    dict_view_state["bool_lod"] = dict_view_state["bool_packed"] and (
+        len(dict_view_state["list_model_names"]) > _INT_LOD_MODEL_THRESHOLD
+    )
+    if dict_view_state["bool_lod"]:
+        dict_view_state["list_trace_representatives"] = (
+            _list_create_representatives(chart_left, dict_view_state)
+        )
+
+    return dict_view_state
+
+
+def _list_create_representatives(chart_left, dict_view_state):
+    # The overview diagram already has one point per cluster, placed at the
+    # mean of its measures, so that point represents the cluster in the detail
+    # diagram. Traces with one model or without a cluster are never collapsed
+    dict_left_points = {}
+    for dict_one_trace in chart_left["data"]:
+        dict_left_points[dict_one_trace["name"].split(". ")[1]] = [
+            float(dict_one_trace["r"][0]),
+            float(dict_one_trace["theta"][0]),
+            [
+                value if isinstance(value, str) else float(value)
+                for value in dict_one_trace["customdata"][0]
+            ],
+        ]
+
+    return [
+        dict_left_points.get(string_trace_name)
+        if len(list_model_indices) > 1
+        else None
+        for string_trace_name, list_model_indices in zip(
+            dict_view_state["list_trace_names"],
+            dict_view_state["list_trace_models"],
+        )
+    ]
+
+
+def _value_first_point(value_input):
+    # Some traces store marker properties per point even though they only have
+    # one point, packed traces need the single value
+    if isinstance(value_input, (list, tuple)):
+        return value_input[0]
+
+    return value_input
+
+
+def _chart_pack_right_diagram(chart_right, dict_view_state):
+    # The polar_diagrams library draws one trace per model. Here we move the
+    # points, markers and hover data of those traces into one Scatterpolargl
+    # trace per cluster, with per-point colors, sizes and symbols
+    list_traces = chart_right["data"]
+    list_packed_traces = []
+    for string_trace_name, list_model_indices in zip(
+        dict_view_state["list_trace_names"],
+        dict_view_state["list_trace_models"],
+    ):
+        list_model_traces = [
+            list_traces[int_i] for int_i in list_model_indices
+        ]
+        list_markers = [trace["marker"] for trace in list_model_traces]
+        list_packed_traces.append(
+            {
+                "type": "scatterpolargl",
+                "name": string_trace_name,
+                "legendgroup": string_trace_name,
+                "r": [trace["r"][0] for trace in list_model_traces],
+                "theta": [trace["theta"][0] for trace in list_model_traces],
+                "customdata": [
+                    trace["customdata"][0] for trace in list_model_traces
+                ],
+                "mode": "markers",
+                "marker": {
+                    "color": [
+                        _value_first_point(dict_marker.get("color"))
+                        for dict_marker in list_markers
+                    ],
+                    "size": [
+                        _value_first_point(dict_marker.get("size"))
+                        for dict_marker in list_markers
+                    ],
+                    "symbol": [
+                        _value_first_point(dict_marker.get("symbol"))
+                        or "circle"
+                        for dict_marker in list_markers
+                    ],
+                    "line": {
+                        "color": [
+                            _value_first_point(
+                                dict_marker.get("line", {}).get("color")
+                            )
+                            for dict_marker in list_markers
+                        ],
+                        "width": list_markers[0].get("line", {}).get("width"),
+                    },
+                },
+                "hoverlabel": {
+                    "bgcolor": list_model_traces[0]["hoverlabel"].get(
+                        "bgcolor"
+                    ),
+                    "bordercolor": [
+                        trace["hoverlabel"].get("bordercolor")
+                        for trace in list_model_traces
+                    ],
+                    "font": list_model_traces[0]["hoverlabel"].get("font", {}),
+                },
+                "hovertemplate": list_model_traces[0].get("hovertemplate"),
+            }
+        )
+
+    return {"data": list_packed_traces, "layout": chart_right["layout"]}
+
+
+def _dict_representative_trace(dict_trace, list_representative):
+    # The representative keeps the style of the first model of its cluster
+    dict_marker = dict_trace["marker"]
+
+    return dict(
+        dict_trace,
+        r=[list_representative[0]],
+        theta=[list_representative[1]],
+        customdata=[list_representative[2]],
+        marker=dict(
+            dict_marker,
+            color=[dict_marker["color"][0]],
+            size=[dict_marker["size"][0]],
+            symbol=[_STRING_REPRESENTATIVE_SYMBOL],
+            line=dict(
+                dict_marker["line"], color=[dict_marker["line"]["color"][0]]
+            ),
+        ),
+        hoverlabel=dict(
+            dict_trace["hoverlabel"],
+            bordercolor=[dict_trace["hoverlabel"]["bordercolor"][0]],
+        ),
+    )
+
+
+def _dict_collapse_right_diagram(
+    chart_right, dict_view_state, list_expanded_traces
+):
+    # Collapsed traces are replaced by their representatives, so the size of
+    # the figure grows with the number of clusters instead of models
+    dict_right = figure_spec.dict_figure(chart_right)
+
+    return {
+        "data": [
+            dict_trace
+            if list_expanded_traces[int_i]
+            else _dict_representative_trace(
+                dict_trace,
+                dict_view_state["list_trace_representatives"][int_i],
+            )
+            for int_i, dict_trace in enumerate(dict_right["data"])
+        ],
+        "layout": dict_right["layout"],
+    }
+
+
 def _tuple_style_both_diagrams(
-    chart_left, chart_left_1d_projections, chart_right, dict_model_cluster
+    chart_left,
+    chart_left_1d_projections,
+    chart_right,
+    dict_view_state,
 ):
     # We use the same radial and angular axis range for both diagrams. This
     # fixes the edge cases where we have different axis ranges because of the
@@ -495,87 +904,133 @@ def _tuple_style_both_diagrams(
     # 0-90 and not 0-180 as the right diagram because of the aggregation of
     # some models during clustering (thus aggregating their coordinates)
 
-    chart_left.update_layout(
-        title=None,
-        polar_radialaxis_range=chart_right["layout"]["polar"]["radialaxis"][
-            "range"
-        ],
-        polar_radialaxis_ticklen=0,
-        polar_radialaxis_showticklabels=False,
-        polar_radialaxis_linewidth=0.5,
-        polar_radialaxis_layer="below traces",
-        polar_radialaxis_autorange=False,
-        polar_radialaxis_rangemode="normal",
-        polar_radialaxis_title=None,
-        polar_angularaxis=chart_right["layout"]["polar"]["angularaxis"],
-        polar_angularaxis_layer="below traces",
-        polar_angularaxis_ticklen=0,
-        polar_angularaxis_showticklabels=False,
-        polar_angularaxis_linewidth=0.5,
-        polar_angularaxis_showgrid=False,
-        polar_sector=[0, _FLOAT_MAX_THETA],
+    figure_spec.dict_update(
+        chart_left["layout"],
+        {
+            "title": None,
+            "polar": {
+                "radialaxis": {
+                    "range": chart_right["layout"]["polar"]["radialaxis"][
+                        "range"
+                    ],
+                    "ticklen": 0,
+                    "showticklabels": False,
+                    "linewidth": 0.5,
+                    "layer": "below traces",
+                    "autorange": False,
+                    "rangemode": "normal",
+                    "title": None,
+                },
+                "angularaxis": chart_right["layout"]["polar"]["angularaxis"],
+                "sector": [0, dict_view_state["float_max_theta"]],
+            },
+        },
+    )
+    figure_spec.dict_update(
+        chart_left["layout"]["polar"]["angularaxis"],
+        {
+            "layer": "below traces",
+            "ticklen": 0,
+            "showticklabels": False,
+            "linewidth": 0.5,
+            "showgrid": False,
+        },
     )
 
-    # We disable a legend for the second diagram by traversing traces
-    dict_right = chart_right.to_dict()
-    for int_i in range(len(dict_right["data"])):
-        str_model_name = dict_right["data"][int_i]["name"].split(". ")[1]
-        dict_right["data"][int_i]["legendgroup"] = dict_model_cluster[
-            str_model_name
-        ]
-        if str_model_name != dict_model_cluster[str_model_name]:
-            dict_right["data"][int_i]["legendgrouptitle_text"] = (
-                dict_model_cluster[str_model_name]
-            )
-
-    chart_right = go.Figure(dict_right)
-    chart_right.update_layout(
-        legend_tracegroupgap=20,
-        legend_title="<b>Data Points</b><br>",
-        legend_title_font_size=14,
-        legend_groupclick="toggleitem",
-        legend_xref="container",
-        legend_yref="container",
-        legend_xanchor="left",
-        legend_yanchor="top",
-        legend_orientation="v",
-        legend_y=0.9,
+    if dict_view_state["bool_packed"]:
+        chart_right = _chart_pack_right_diagram(chart_right, dict_view_state)
+        # Legend clicks on a packed trace toggle all of its models in the 1D
+        # projections, so the browser needs to know which models those are
+        chart_left_1d_projections["layout"]["meta"] = {
+            "list_trace_models": dict_view_state["list_trace_models"]
+        }
+    else:
+        # We disable a legend for the second diagram by traversing traces
+        for int_i, int_cluster in enumerate(
+            dict_view_state["list_model_clusters"]
+        ):
+            str_model_name = dict_view_state["list_model_names"][int_i]
+            str_cluster_name = dict_view_state["list_cluster_names"][
+                int_cluster
+            ]
+            chart_right["data"][int_i]["legendgroup"] = str_cluster_name
+            if str_model_name != str_cluster_name:
+                chart_right["data"][int_i]["legendgrouptitle"] = {
+                    "text": str_cluster_name
+                }
+    figure_spec.dict_update(
+        chart_right["layout"],
+        {
+            "legend": {
+                "tracegroupgap": 20,
+                "title": {
+                    "text": "<b>Data Points</b><br>",
+                    "font": {"size": 14},
+                },
+                "groupclick": "toggleitem",
+                "xref": "container",
+                "yref": "container",
+                "xanchor": "left",
+                "yanchor": "top",
+                "orientation": "v",
+                "y": 0.9,
+            }
+        },
     )
 
-    float_width_division = 3.2 if _FLOAT_MAX_THETA == 180.0 else 3.6
-    float_height_subtraction = 230 if _FLOAT_MAX_THETA == 180.0 else 240
+    bool_half_circle = dict_view_state["float_max_theta"] == 180.0
+    float_width_division = 3.2 if bool_half_circle else 3.6
+    float_height_subtraction = 230 if bool_half_circle else 240
     dict_margin = (
         {"l": 0, "r": 0, "t": 0, "b": 0}
-        if _FLOAT_MAX_THETA == 180.0
+        if bool_half_circle
         else {"t": 10, "b": 20, "r": 0}
     )
-    chart_left.update_layout(
-        width=round(_INT_CHART_WIDTH / float_width_division),
-        height=_INT_CHART_HEIGHT - float_height_subtraction,
-        margin=dict_margin,
+    figure_spec.dict_update(
+        chart_left["layout"],
+        {
+            "width": round(_INT_CHART_WIDTH / float_width_division),
+            "height": _INT_CHART_HEIGHT - float_height_subtraction,
+            "margin": dict_margin,
+        },
     )
 
-    chart_left_1d_projections.update_xaxes(
-        showgrid=False, showline=False, ticklabelposition="inside top"
+    figure_spec.dict_update_axes(
+        chart_left_1d_projections,
+        "xaxis",
+        {
+            "showgrid": False,
+            "showline": False,
+            "ticklabelposition": "inside top",
+        },
     )
-    chart_left_1d_projections.update_yaxes(
-        showline=False,
-        showgrid=False,
-        zeroline=True,
-        zerolinecolor="black",
-        zerolinewidth=1,
-        showticklabels=False,
-        ticks="",
+    figure_spec.dict_update_axes(
+        chart_left_1d_projections,
+        "yaxis",
+        {
+            "showline": False,
+            "showgrid": False,
+            "zeroline": True,
+            "zerolinecolor": "black",
+            "zerolinewidth": 1,
+            "showticklabels": False,
+            "ticks": "",
+        },
     )
 
-    chart_left_1d_projections.update_layout(
-        height=400,
-        template="simple_white",
-        dragmode=False,
-        showlegend=False,
-        xaxis1=dict(range=[-0.1, _FLOAT_MAX_R]),
-        xaxis2=dict(range=_LIST_MIN_MAX_ANGULAR),
-        xaxis3=dict(range=[-0.1, _FLOAT_MAX_DISTANCE]),
+    chart_left_1d_projections["layout"]["template"] = (
+        figure_spec.dict_template("simple_white")
+    )
+    figure_spec.dict_update(
+        chart_left_1d_projections["layout"],
+        {
+            "height": 400,
+            "dragmode": False,
+            "showlegend": False,
+            "xaxis": {"range": [-0.1, dict_view_state["float_max_r"]]},
+            "xaxis2": {"range": dict_view_state["list_min_max_angular"]},
+            "xaxis3": {"range": [-0.1, dict_view_state["float_max_distance"]]},
+        },
     )
 
     return chart_left, chart_left_1d_projections, chart_right
@@ -587,6 +1042,7 @@ def _tuple_create_both_diagrams(
     string_dataset,
     string_diagram_type="taylor",
     string_mid_type="normalized",
+    dict_mi_parameters=None,
 ):
 
     list_valid_diagram_types = ["taylor", "mid"]
@@ -602,147 +1058,355 @@ def _tuple_create_both_diagrams(
     ):
         raise ValueError("string_mid_type not in " + str(list_valid_mid_types))
 
-    (chart_left, chart_left_size_legend, dict_model_cluster) = (
-        _tuple_create_initial_left_diagram(
+    # The measures are estimated once and then shared by both diagrams
+    background_jobs.report_progress("measures")
+    with diagnostics.collect() as list_measure_warnings:
+        list_df_measures, list_relevant_measures = _tuple_calculate_measures(
             df_input,
             string_reference_model,
-            string_dataset,  # Using it to save the best DBSCAN parameters
             string_diagram_type,
             string_mid_type,
+            dict_mi_parameters,
         )
+
+    background_jobs.report_progress("clustering")
+    (
+        chart_left,
+        chart_left_size_legend,
+        dict_cluster_index,
+        float_max_distance,
+        tuple_dbscan_parameters,
+    ) = _tuple_create_initial_left_diagram(
+        list_df_measures[0],
+        list_relevant_measures,
+        string_reference_model,
+        string_dataset,  # Using it to save the best DBSCAN parameters
+        string_diagram_type,
+        string_mid_type,
     )
 
+    background_jobs.report_progress("figures")
     (chart_right, chart_left_1d_projections, list_warnings) = (
         _tuple_create_initial_right_diagram(
-            df_input,
+            list_df_measures,
+            list_relevant_measures,
             string_reference_model,
             string_diagram_type,
             string_mid_type,
+            list_measure_warnings,
         )
     )
 
+    dict_view_state = _dict_create_view_state(
+        chart_left,
+        chart_left_1d_projections,
+        chart_right,
+        dict_cluster_index,
+        float_max_distance,
+        tuple_dbscan_parameters,
+    )
+
     (chart_left, chart_left_1d_projections, chart_right) = (
         _tuple_style_both_diagrams(
             chart_left,
             chart_left_1d_projections,
             chart_right,
-            dict_model_cluster,
+            dict_view_state,
         )
     )
 
-    global _DICT_CLUSTER_MODEL
-    global _LIST_MODEL_NAMES
+    return (
+        figure_spec.dict_validated(chart_left),
+        figure_spec.dict_validated(chart_left_size_legend),
+        figure_spec.dict_validated(chart_left_1d_projections),
+        figure_spec.dict_validated(chart_right),
+        list_warnings,
+        dict_view_state,
+    )
 
-    _DICT_CLUSTER_MODEL = {}
-    for string_model in dict_model_cluster:
-        string_cluster = dict_model_cluster[string_model]
-        if string_cluster not in _DICT_CLUSTER_MODEL:
-            _DICT_CLUSTER_MODEL[string_cluster] = [string_model]
-        else:
-            _DICT_CLUSTER_MODEL[string_cluster].append(string_model)
 
-    _LIST_MODEL_NAMES = [
-        dict_one_trace["name"].split(". ")[1]
-        for dict_one_trace in chart_right["data"]
-    ]
+def _tuple_create_both_diagrams_cached(
+    df_input,
+    string_reference_model,
+    string_dataset,
+    string_diagram_type="taylor",
+    string_mid_type="normalized",
+    dict_mi_parameters=None,
+):
+    tuple_key = (
+        string_dataset,
+        string_diagram_type,
+        string_mid_type if string_diagram_type == "mid" else None,
+        string_reference_model,
+    )
+
+    # Precomputed figures from the artifact bundle are used before the LRU
+    tuple_diagrams = _DICT_BUNDLE_FIGURES.get(tuple_key)
+    if tuple_diagrams is None:
+        tuple_diagrams = _CACHE_FIGURES.get(tuple_key)
+
+    if tuple_diagrams is None:
+        tuple_diagrams = _tuple_create_both_diagrams(
+            df_input,
+            string_reference_model,
+            string_dataset,
+            string_diagram_type,
+            string_mid_type,
+            dict_mi_parameters,
+        )
+        _CACHE_FIGURES.set(tuple_key, tuple_diagrams)
+
+    return tuple_diagrams
+
+
+def _list_export_bundle_views(string_case_study, list_views):
+    # Every view of the case study is computed live and returned in a JSON
+    # serializable form for the artifact bundle
+    (
+        df_input,
+        string_reference_model,
+        string_dataset,
+        dict_mi_parameters,
+    ) = _tuple_get_case_study(string_case_study)
+
+    list_result = []
+    for string_diagram_type, string_mid_type in list_views:
+        (
+            chart_left,
+            chart_left_size_legend,
+            chart_left_1d_projections,
+            chart_right,
+            list_warnings,
+            dict_view_state,
+        ) = _tuple_create_both_diagrams(
+            df_input,
+            string_reference_model,
+            string_dataset,
+            string_diagram_type,
+            string_mid_type,
+            dict_mi_parameters,
+        )
+        list_df_measures, _ = _tuple_calculate_measures(
+            df_input,
+            string_reference_model,
+            string_diagram_type,
+            string_mid_type,
+            dict_mi_parameters,
+        )
+        list_result.append(
+            {
+                "dataset": string_dataset,
+                "diagram_type": string_diagram_type,
+                "mid_type": string_mid_type,
+                "reference_model": string_reference_model,
+                "figures": [
+                    chart_left,
+                    chart_left_size_legend,
+                    chart_left_1d_projections,
+                    chart_right,
+                ],
+                "warnings": [i for i in list_warnings if isinstance(i, str)],
+                "state": dict_view_state,
+                "measures": list_df_measures[0],
+                # The dashboard finds the bundled measures in the property
+                # cache under this key
+                "measures_key": property_cache.string_properties_key(
+                    _df_measured_input(df_input),
+                    string_reference_model,
+                    string_diagram_type,
+                    dict_mi_parameters,
+                ),
+            }
+        )
+
+    return list_result
+
+
+def _import_bundle_views(list_views):
+    for dict_view in list_views:
+        tuple_key = (
+            dict_view["dataset"],
+            dict_view["diagram_type"],
+            dict_view["mid_type"],
+            dict_view["reference_model"],
+        )
+        _DICT_BUNDLE_FIGURES[tuple_key] = (
+            *dict_view["figures"],
+            _list_create_warning_components(dict_view["warnings"]),
+            dict_view["state"],
+        )
+
+
+def _tuple_get_case_study(string_case_study):
+    # Case studies are loaded once per process by the registry, so every
+    # session and worker can look them up instead of keeping module globals
+    dict_case_study = registry.dict_get_case_study(string_case_study)
+    _, list_df_input = registry.tuple_load_case_study(string_case_study)
+
+    # A second file holds scalar values that are encoded using the marker size
+    df_input = list_df_input if len(list_df_input) > 1 else list_df_input[0]
 
     return (
+        df_input,
+        dict_case_study["reference_model"],
+        dict_case_study["dataset"],
+        dict_case_study["mi_parameters"],
+    )
+
+
+def _tuple_create_session_diagrams(
+    string_session_id,
+    string_case_study,
+    string_diagram_type,
+    string_mid_type,
+):
+    background_jobs.report_progress("load")
+    (
+        df_input,
+        string_reference_model,
+        string_dataset,
+        dict_mi_parameters,
+    ) = _tuple_get_case_study(string_case_study)
+
+    (
         chart_left,
         chart_left_size_legend,
         chart_left_1d_projections,
         chart_right,
         list_warnings,
+        dict_view_state,
+    ) = _tuple_create_both_diagrams_cached(
+        df_input,
+        string_reference_model,
+        string_dataset,
+        string_diagram_type,
+        string_mid_type,
+        dict_mi_parameters,
     )
 
-
-def _layout_return(int_option):
-    global \
-        _DF_INPUT, \
-        _STRING_DATASET, \
-        _STRING_REFERENCE_MODEL, \
-        _DICT_MI_PARAMETERS
-    if int_option == 2:
-        _STRING_DATASET = "Case_Study_Ecoli"
-        _DF_INPUT = [
-            pd.read_csv(
-                os.path.join(
-                    "..", "data", _STRING_DATASET, "ecoli_evaluation.csv"
-                )
-            ),
-            pd.read_csv(
-                os.path.join(
-                    "..",
-                    "data",
-                    "Case_Study_Ecoli",
-                    "ecoli_time_evaluation.csv",
-                )
-            ),
+    # Large detail diagrams start with every cluster collapsed
+    list_expanded_traces = None
+    if dict_view_state.get("bool_lod"):
+        list_expanded_traces = [
+            list_representative is None
+            for list_representative in dict_view_state[
+                "list_trace_representatives"
+            ]
         ]
-        _STRING_REFERENCE_MODEL = "Ground_Truth"
-        _DICT_MI_PARAMETERS = dict(
-            string_entropy_method="auto",
-            int_mi_n_neighbors=3,
-            bool_discrete_reference_model=True,
-            discrete_models=True,
-            int_random_state=42,
+        chart_right = _dict_collapse_right_diagram(
+            chart_right, dict_view_state, list_expanded_traces
         )
 
-    elif int_option == 1:
-        _STRING_DATASET = "Case_Study_Wine"
-        _DF_INPUT = pd.read_csv(
-            os.path.join("..", "data", _STRING_DATASET, "wine_sampled.csv")
-        )
-        _STRING_REFERENCE_MODEL = "Median"
-        _DICT_MI_PARAMETERS = dict(
-            string_entropy_method="auto",
-            int_mi_n_neighbors=3,
-            bool_discrete_reference_model=False,
-            discrete_models=False,
-            int_random_state=42,
-        )
-    elif int_option == 3:
-        _STRING_DATASET = "Case_Study_Cluttered_Wine"
-        _DF_INPUT = pd.read_csv(
-            os.path.join("..", "data", _STRING_DATASET, "wine_cluttered.csv")
-        )
-        _STRING_REFERENCE_MODEL = "Median"
-        _DICT_MI_PARAMETERS = dict(
-            string_entropy_method="auto",
-            int_mi_n_neighbors=3,
-            bool_discrete_reference_model=False,
-            discrete_models=False,
-            int_random_state=42,
-        )
-    else:
-        _STRING_DATASET = "Case_Study_Climate"
-        _DF_INPUT = pd.read_csv(
-            os.path.join(
-                "..", "data", _STRING_DATASET, "climate_models_temp.csv"
-            )
-        )
-        _STRING_REFERENCE_MODEL = "Observation"
-        _DICT_MI_PARAMETERS = dict(
-            string_entropy_method="auto",
-            int_mi_n_neighbors=3,
-            bool_discrete_reference_model=False,
-            discrete_models=False,
-            int_random_state=42,
-        )
+    # The zoom callback can land on any thread or worker, so it reads the
+    # view state of the shown diagrams from the session store
+    session_store.update_session(
+        string_session_id,
+        {
+            "case_study": string_case_study,
+            "list_figure_key": [
+                string_case_study,
+                string_diagram_type,
+                string_mid_type,
+            ],
+            "view_state": dict_view_state,
+            "list_expanded_traces": list_expanded_traces,
+            "bool_left_selection": False,
+            # Every model is visible in freshly rendered diagrams
+            "list_right_visible": [True] * _int_right_traces(dict_view_state),
+            "list_projections_visible": [True]
+            * len(dict_view_state["list_model_r"]),
+        },
+    )
 
+    # Numbers of the figures sent to the browser can be rounded and packed
+    # into typed arrays, see utils/figure_payload.py. The clientside legend
+    # callback reads the arrays of the 1D projections, which stay plain lists
+    return (
+        figure_payload.dict_encode_figure(chart_left),
+        figure_payload.dict_encode_figure(chart_left_size_legend),
+        figure_payload.dict_encode_figure(
+            chart_left_1d_projections, bool_typed_arrays=False
+        ),
+        figure_payload.dict_encode_figure(chart_right),
+        list_warnings,
+        dict_view_state,
+    )
+
+
+def _layout_return(string_case_study, string_session_id):
     (
         chart_left,
         chart_left_size_legend,
         chart_left_1d_projections,
         chart_right,
         list_warnings,
-    ) = _tuple_create_both_diagrams(
-        _DF_INPUT,
-        _STRING_REFERENCE_MODEL,
-        _STRING_DATASET,
+        dict_view_state,
+    ) = _tuple_create_session_diagrams(
+        string_session_id,
+        string_case_study,
         _STRING_DIAGRAM_TYPE,
         _STRING_MID_TYPE,
     )
 
+    return _list_create_layout(
+        chart_left,
+        chart_left_size_legend,
+        chart_left_1d_projections,
+        chart_right,
+        list_warnings,
+        dict_view_state,
+    )
+
+
+def _layout_skeleton():
+    # The skeleton only declares the component IDs used by the callbacks, so
+    # it can serve as a validation layout without reading or computing data
+    return _list_create_layout({}, {}, {}, {}, [], None)
+
+
+def _list_create_cluster_controls(dict_view_state):
+    # Epsilon and minPts of the clustering in the overview diagram. Without a
+    # view state the sliders only declare their IDs
+    float_eps, int_min_pts, float_max_eps = (
+        dict_view_state["list_dbscan_parameters"]
+        if dict_view_state is not None
+        else (0.5, 2, 1.0)
+    )
+
+    return [
+        html.Div("DBSCAN ε", style={"font-size": 12}),
+        dcc.Slider(
+            id="slider-eps",
+            min=float_max_eps / 100,
+            max=float_max_eps,
+            step=float_max_eps / 100,
+            value=min(float_eps, float_max_eps),
+            marks=None,
+            updatemode="drag",
+            tooltip={"placement": "bottom"},
+        ),
+        html.Div("DBSCAN minPts", style={"font-size": 12}),
+        dcc.Slider(
+            id="slider-min-pts",
+            min=1,
+            max=max(10, 3 * int_min_pts),
+            step=1,
+            value=int_min_pts,
+            marks=None,
+            updatemode="drag",
+            tooltip={"placement": "bottom"},
+        ),
+    ]
+
+
+def _list_create_layout(
+    chart_left,
+    chart_left_size_legend,
+    chart_left_1d_projections,
+    chart_right,
+    list_warnings,
+    dict_view_state,
+):
     layout = [
         dbc.Col(
             [
@@ -795,6 +1459,11 @@ def _layout_return(int_option):
                     },
                     style={"margin-bottom": 0, "margin-top": 0},
                 ),
+                html.Div(
+                    _list_create_cluster_controls(dict_view_state),
+                    id="cluster-controls",
+                    style={"margin-left": 50, "margin-right": 50},
+                ),
                 dcc.Graph(
                     id="chart-left-projections",
                     figure=chart_left_1d_projections,
@@ -849,6 +1518,9 @@ def _layout_return(int_option):
                         "showAxisDragHandles": False,
                     },
                 ),
+                # Legend clicks since the last zoom or selection, which only
+                # the browser knows about, see assets/polar_legends.js
+                dcc.Store(id="store-legend-visible", data={}),
                 html.Div(
                     dbc.Alert(
                         list_warnings,
@@ -868,7 +1540,7 @@ def _layout_return(int_option):
     return layout
 
 
-@callback(
+@background_jobs.callback(
     Output(
         component_id="chart-left",
         component_property="figure",
@@ -891,10 +1563,19 @@ def _layout_return(int_option):
     ),
     Output("alert-warnings", "children"),
     Output("alert-warnings", "is_open"),
+    Output("cluster-controls", "children"),
+    Output("store-legend-visible", "data"),
     Input("selected-diagram-type", "value"),
+    State("session-id", "data"),
     prevent_initial_call=True,
 )
-def update_output(string_selected_diagram_type):
+def update_output(string_selected_diagram_type, string_session_id):
+    string_case_study = session_store.dict_get_session(string_session_id).get(
+        "case_study"
+    )
+    if string_case_study is None:
+        raise PreventUpdate
+
     if string_selected_diagram_type == "taylor":
         string_diagram_type = "taylor"
         string_mid_type = None
@@ -911,10 +1592,10 @@ def update_output(string_selected_diagram_type):
         chart_left_1d_projections,
         chart_right,
         list_warnings,
-    ) = _tuple_create_both_diagrams(
-        _DF_INPUT,
-        _STRING_REFERENCE_MODEL,
-        _STRING_DATASET,
+        dict_view_state,
+    ) = _tuple_create_session_diagrams(
+        string_session_id,
+        string_case_study,
         string_diagram_type,
         string_mid_type,
     )
@@ -928,9 +1609,143 @@ def update_output(string_selected_diagram_type):
         chart_right,
         list_warnings,
         bool_is_open,
+        _list_create_cluster_controls(dict_view_state),
+        {},
+    )
+
+
+def _int_right_traces(dict_view_state):
+    # Packed detail diagrams have one trace per cluster, all others one trace
+    # per model
+    if dict_view_state["bool_packed"]:
+        return len(dict_view_state["list_trace_models"])
+
+    return len(dict_view_state["list_model_r"])
+
+
+def _np_browser_visible(
+    list_visible, dict_legend_visible, list_trace_models=None
+):
+    # Legend clicks only change the traces in the browser, which sends them
+    # along with every zoom and selection, so they are applied to the
+    # visibility kept in the session. A click on a packed trace changes all
+    # of its models
+    np_visible = np.array(list_visible, dtype=bool)
+    if not np_visible.size:
+        return np_visible
+
+    for string_trace, bool_visible in (dict_legend_visible or {}).items():
+        int_trace = int(string_trace)
+        np_visible[
+            list_trace_models[int_trace]
+            if list_trace_models is not None
+            else int_trace
+        ] = bool_visible
+
+    return np_visible
+
+
+def _list_patch_visibility(chart_updated, list_old_visible, np_visible):
+    # Only the traces whose visibility changed are written to the Patch
+    for int_i in polar_selection.np_changed_indices(
+        list_old_visible, np_visible
+    ):
+        chart_updated["data"][int_i]["visible"] = (
+            True if np_visible[int_i] else "legendonly"
+        )
+
+    return np_visible.tolist()
+
+
+def _list_patch_projections(
+    chart_updated, list_old_visible, np_visible, dict_view_state
+):
+    # Every 1D projection is one trace with a point per model. Hidden models
+    # get no x value, so a change is one array per measure instead of one
+    # visibility flag per model and measure
+    if polar_selection.np_changed_indices(list_old_visible, np_visible).size:
+        for int_j, list_projection_x in enumerate(
+            dict_view_state["list_projection_x"]
+        ):
+            chart_updated["data"][int_j]["x"] = np.where(
+                np_visible, np.asarray(list_projection_x, dtype=object), None
+            ).tolist()
+
+    return np_visible.tolist()
+
+
+def _chart_get_full_right_diagram(dict_session):
+    # The session only remembers which diagram is shown, the full detail
+    # diagram comes from the figure cache of this process
+    (
+        string_case_study,
+        string_diagram_type,
+        string_mid_type,
+    ) = dict_session["list_figure_key"]
+    (
+        df_input,
+        string_reference_model,
+        string_dataset,
+        dict_mi_parameters,
+    ) = _tuple_get_case_study(string_case_study)
+
+    return _tuple_create_both_diagrams_cached(
+        df_input,
+        string_reference_model,
+        string_dataset,
+        string_diagram_type,
+        string_mid_type,
+        dict_mi_parameters,
+    )[3]
+
+
+def _np_expanded_traces(dict_view_state, np_models):
+    # A cluster is expanded as soon as one of its models is in np_models
+    return np.array(
+        [
+            list_representative is None
+            or bool(np_models[list_model_indices].any())
+            for list_representative, list_model_indices in zip(
+                dict_view_state["list_trace_representatives"],
+                dict_view_state["list_trace_models"],
+            )
+        ]
     )
 
 
+def _list_patch_lod(chart_updated, dict_session, np_expanded):
+    # Only the clusters that are expanded or collapsed are written to the
+    # Patch, with their members taken from the full detail diagram
+    np_changed = polar_selection.np_changed_indices(
+        dict_session.get("list_expanded_traces") or [], np_expanded
+    )
+    if np_changed.size:
+        dict_right = figure_spec.dict_figure(
+            _chart_get_full_right_diagram(dict_session)
+        )
+        for int_i in np_changed:
+            dict_trace = dict_right["data"][int_i]
+            if not np_expanded[int_i]:
+                dict_trace = _dict_representative_trace(
+                    dict_trace,
+                    dict_session["view_state"]["list_trace_representatives"][
+                        int_i
+                    ],
+                )
+            for string_key in [
+                "r",
+                "theta",
+                "customdata",
+                "marker",
+                "hoverlabel",
+            ]:
+                chart_updated["data"][int_i][string_key] = dict_trace[
+                    string_key
+                ]
+
+    return np_expanded.tolist()
+
+
 @callback(
     Output(
         component_id="chart-left",
@@ -947,15 +1762,22 @@ def update_output(string_selected_diagram_type):
         component_property="figure",
         allow_duplicate=True,
     ),
+    Output("store-legend-visible", "data", allow_duplicate=True),
     Input(component_id="chart-left", component_property="relayoutData"),
-    State("chart-left", "figure"),
-    State("chart-left-projections", "figure"),
-    State("chart-right", "figure"),
+    State("session-id", "data"),
+    State("store-legend-visible", "data"),
     prevent_initial_call=True,
 )
 def _list_update_zooms(
-    dict_selected_range, dict_left, dict_left_projections, dict_right
+    dict_selected_range, string_session_id, dict_legend_visible
 ):
+    # Everything we need to know about the shown diagrams is kept in the
+    # session, so the figures themselves are never sent to the server
+    dict_session = session_store.dict_get_session(string_session_id)
+    dict_view_state = dict_session.get("view_state")
+    if dict_view_state is None:
+        raise PreventUpdate
+    bool_left_selection = dict_session.get("bool_left_selection", False)
 
     chart_left_updated = Patch()
     chart_left_projections_updated = Patch()
@@ -966,9 +1788,10 @@ def _list_update_zooms(
     ):
         dict_radial_range = dict_selected_range["polar.radialaxis.range"]
 
-        for int_i, trace in enumerate(dict_left["data"]):
-            if "name" in trace and trace["name"] == "Selection":
-                del chart_left_updated["data"][int_i]
+        # The Selection trace is always appended after the overview traces
+        if bool_left_selection:
+            del chart_left_updated["data"][dict_view_state["int_left_traces"]]
+            bool_left_selection = False
 
         # Here we check if double click was not detected. If it was detected
         # we just had to remove the Selection trace, which we did above.
@@ -982,9 +1805,12 @@ def _list_update_zooms(
         ):
             # We create a circular rectangle of 60 points by creating them and
             # connecting them with a line
-            np_alpha = np.linspace(0, _FLOAT_MAX_THETA, 60).tolist()
+            np_alpha = np.linspace(
+                0, dict_view_state["float_max_theta"], 60
+            ).tolist()
             np_selection_theta = np_alpha + np_alpha[::-1] + [np_alpha[0]]
 
+            bool_left_selection = True
             chart_left_updated["data"].append(
                 go.Scatterpolar(
                     r=[dict_radial_range[0]] * 60
@@ -1023,26 +1849,15 @@ def _list_update_zooms(
                 dict_radial_range[1],
             ]
 
-            # We update the legend with the selected points both on the right
-            # diagram and 1d projections on the left
-            for int_i, dict_one_trace in enumerate(dict_right["data"]):
-                if (
-                    dict_radial_range[0]
-                    <= dict_one_trace["r"][0]
-                    <= dict_radial_range[1]
-                ):
-                    chart_right_updated["data"][int_i]["visible"] = True
-
-                    for int_j in range(3):
-                        chart_left_projections_updated["data"][
-                            int_i * 3 + int_j
-                        ]["visible"] = True
-                else:
-                    chart_right_updated["data"][int_i]["visible"] = "legendonly"
-                    for int_j in range(3):
-                        chart_left_projections_updated["data"][
-                            int_i * 3 + int_j
-                        ]["visible"] = False
+            # We show only the models inside the selected radial range both on
+            # the right diagram and in the 1d projections on the left
+            np_visible = polar_selection.np_mask_models(
+                polar_selection.dict_create_model_arrays(dict_view_state),
+                list_radial_range=dict_radial_range,
+            )
+            # Clusters with models inside the selected range are expanded
+            np_lod_models = np_visible
+            bool_reset = False
 
         else:
             # We reset the color to black on doubleclick
@@ -1063,18 +1878,62 @@ def _list_update_zooms(
             # We reset the radial axis boundaries of the right chart
             chart_right_updated["layout"]["polar"]["radialaxis"]["range"] = [
                 dict_radial_range[0],
-                _FLOAT_MAX_R,
+                dict_view_state["float_max_r"],
             ]
 
             # We also reset the legend trace visibility for both right diagram
             # and left 1d projections
-            for int_i, dict_one_trace in enumerate(dict_right["data"]):
-                chart_right_updated["data"][int_i]["visible"] = True
+            np_visible = polar_selection.np_mask_models(
+                polar_selection.dict_create_model_arrays(dict_view_state)
+            )
+            # and collapse all clusters again
+            np_lod_models = np.zeros_like(np_visible)
+            bool_reset = True
+
+        list_trace_models = (
+            dict_view_state["list_trace_models"]
+            if dict_view_state["bool_packed"]
+            else None
+        )
+        if bool_reset:
+            # A double click shows every model again, whatever the browser
+            # shows now, so every trace is written to the Patch
+            np_right_old = []
+            np_projections_old = []
+        else:
+            np_right_old = _np_browser_visible(
+                dict_session.get("list_right_visible", []),
+                dict_legend_visible,
+            )
+            np_projections_old = _np_browser_visible(
+                dict_session.get("list_projections_visible", []),
+                dict_legend_visible,
+                list_trace_models,
+            )
 
-                for int_j in range(3):
-                    chart_left_projections_updated["data"][int_i * 3 + int_j][
-                        "visible"
-                    ] = True
+        # Packed traces hold many models, so there the radial range of the
+        # detail diagram alone hides the models outside of the selection and
+        # every packed trace stays visible
+        list_right_visible = _list_patch_visibility(
+            chart_right_updated,
+            np_right_old,
+            np.ones(_int_right_traces(dict_view_state), dtype=bool)
+            if dict_view_state["bool_packed"]
+            else np_visible,
+        )
+        list_projections_visible = _list_patch_projections(
+            chart_left_projections_updated,
+            np_projections_old,
+            np_visible,
+            dict_view_state,
+        )
+        list_expanded_traces = dict_session.get("list_expanded_traces")
+        if dict_view_state.get("bool_lod"):
+            list_expanded_traces = _list_patch_lod(
+                chart_right_updated,
+                dict_session,
+                _np_expanded_traces(dict_view_state, np_lod_models),
+            )
 
         chart_left_updated["layout"]["polar"]["radialaxis"]["autorange"] = False
         chart_left_updated["layout"]["polar"]["radialaxis"]["rangemode"] = (
@@ -1088,16 +1947,29 @@ def _list_update_zooms(
         )
         chart_left_updated["layout"]["polar"]["radialaxis"]["range"] = [
             0,
-            _FLOAT_MAX_R,
+            dict_view_state["float_max_r"],
         ]
 
     else:
         raise PreventUpdate
 
+    session_store.update_session(
+        string_session_id,
+        {
+            "bool_left_selection": bool_left_selection,
+            "list_right_visible": list_right_visible,
+            "list_projections_visible": list_projections_visible,
+            "list_expanded_traces": list_expanded_traces,
+        },
+    )
+
+    # The Patch leaves the browser with the visibility saved in the session,
+    # so the legend clicks sent along are no longer needed
     return (
         chart_left_updated,
         chart_left_projections_updated,
         chart_right_updated,
+        {},
     )
 
 
@@ -1107,42 +1979,228 @@ def _list_update_zooms(
         component_property="figure",
         allow_duplicate=True,
     ),
-    Input(component_id="chart-right", component_property="restyleData"),
-    State("chart-left-projections", "figure"),
-    State("chart-right", "figure"),
+    Output(
+        component_id="chart-right",
+        component_property="figure",
+        allow_duplicate=True,
+    ),
+    Output("store-legend-visible", "data", allow_duplicate=True),
+    Input(component_id="chart-right", component_property="selectedData"),
+    State("session-id", "data"),
+    State("store-legend-visible", "data"),
     prevent_initial_call=True,
 )
-def _list_update_legends(list_legend_points, dict_left_projections, dict_right):
+def _list_update_selection(
+    dict_selected_data, string_session_id, dict_legend_visible
+):
+    dict_session = session_store.dict_get_session(string_session_id)
+    dict_view_state = dict_session.get("view_state")
+    if dict_view_state is None:
+        raise PreventUpdate
+
+    # A box or lasso selection on the detail diagram keeps only the selected
+    # models in the 1D projections. Clearing the selection shows all of them
+    np_visible = polar_selection.np_mask_models(
+        polar_selection.dict_create_model_arrays(dict_view_state),
+        list_selected_points=(
+            dict_selected_data["points"] if dict_selected_data else None
+        ),
+        list_trace_models=dict_view_state.get("list_trace_models"),
+        list_expanded_traces=dict_session.get("list_expanded_traces"),
+    )
+
+    # Selecting the representative of a collapsed cluster sends its members
+    chart_right_updated = Patch()
+    list_expanded_traces = dict_session.get("list_expanded_traces")
+    if dict_view_state.get("bool_lod") and dict_selected_data:
+        np_expanded = np.array(list_expanded_traces, dtype=bool)
+        for dict_point in dict_selected_data["points"]:
+            if "curveNumber" in dict_point:
+                np_expanded[dict_point["curveNumber"]] = True
+        list_expanded_traces = _list_patch_lod(
+            chart_right_updated, dict_session, np_expanded
+        )
 
     chart_left_projections_updated = Patch()
+    list_projections_visible = _list_patch_projections(
+        chart_left_projections_updated,
+        _np_browser_visible(
+            dict_session.get("list_projections_visible", []),
+            dict_legend_visible,
+            dict_view_state.get("list_trace_models")
+            if dict_view_state["bool_packed"]
+            else None,
+        ),
+        np_visible,
+        dict_view_state,
+    )
+    # The detail diagram keeps the legend clicks, which are saved in the
+    # session from now on
+    session_store.update_session(
+        string_session_id,
+        {
+            "list_right_visible": _np_browser_visible(
+                dict_session.get("list_right_visible", []),
+                dict_legend_visible,
+            ).tolist(),
+            "list_projections_visible": list_projections_visible,
+            "list_expanded_traces": list_expanded_traces,
+        },
+    )
 
-    # We check if we have an event and if the click was not empty
-    if list_legend_points and list_legend_points[0]:
-        # ----- One legend click gives the following output:
-        # [{"visible": ["legendonly"]}, [10]]
-        # [{"visible": [true]}, [1]]
-        # ----- Group click:
-        # [{'visible': ['legendonly', 'legendonly', True, True, 'legendonly',
-        #               'legendonly', 'legendonly', 'legendonly', 'legendonly',
-        #               'legendonly', 'legendonly', 'legendonly']},
-        #  [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]]
-        # ----- Empty legend click:
-        # [{}, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]]
-        if list_legend_points:
-            for int_i, int_legend_point in enumerate(list_legend_points[1]):
-                if (
-                    isinstance(list_legend_points[0]["visible"][int_i], bool)
-                    and list_legend_points[0]["visible"][int_i]
-                ):
-                    bool_show_model = True
-                else:
-                    bool_show_model = False
-
-                for int_j in range(3):
-                    chart_left_projections_updated["data"][
-                        int_legend_point * 3 + int_j
-                    ]["visible"] = bool_show_model
-    else:
+    return chart_left_projections_updated, chart_right_updated, {}
+
+
+@callback(
+    Output(
+        component_id="chart-left",
+        component_property="figure",
+        allow_duplicate=True,
+    ),
+    Output(
+        component_id="chart-left-legend",
+        component_property="figure",
+        allow_duplicate=True,
+    ),
+    Output(
+        component_id="chart-right",
+        component_property="figure",
+        allow_duplicate=True,
+    ),
+    Input(component_id="slider-eps", component_property="value"),
+    Input(component_id="slider-min-pts", component_property="value"),
+    State("session-id", "data"),
+    prevent_initial_call=True,
+)
+def _list_update_clusters(float_eps, int_min_pts, string_session_id):
+    dict_session = session_store.dict_get_session(string_session_id)
+    if (
+        dict_session.get("view_state") is None
+        or float_eps is None
+        or int_min_pts is None
+    ):
         raise PreventUpdate
+    # The view state may be shared with other sessions through the figure
+    # cache, so the new clusters are written into a copy of it
+    dict_view_state = dict(dict_session["view_state"])
 
-    return chart_left_projections_updated
+    # Only the clustering changes, so the measures are kept per shown diagram
+    # and the neighbor graph comes from the graph cache
+    (
+        string_case_study,
+        string_diagram_type,
+        string_mid_type,
+    ) = dict_session["list_figure_key"]
+    (
+        df_input,
+        string_reference_model,
+        string_dataset,
+        dict_mi_parameters,
+    ) = _tuple_get_case_study(string_case_study)
+    # The slider sends an event for every step of a drag, so the whole
+    # ensemble is hashed for the property cache only once per diagram
+    tuple_measures = _CACHE_MEASURES.get(
+        tuple(dict_session["list_figure_key"])
+    )
+    if tuple_measures is None:
+        # The warnings were already shown with the diagrams, so they are
+        # dropped
+        with diagnostics.collect():
+            tuple_measures = _tuple_calculate_measures(
+                df_input,
+                string_reference_model,
+                string_diagram_type,
+                string_mid_type,
+                dict_mi_parameters,
+            )
+        _CACHE_MEASURES.set(
+            tuple(dict_session["list_figure_key"]), tuple_measures
+        )
+    list_df_measures, list_relevant_measures = tuple_measures
+
+    (
+        chart_left,
+        chart_left_size_legend,
+        dict_cluster_index,
+        _,
+        tuple_dbscan_parameters,
+    ) = _tuple_create_initial_left_diagram(
+        list_df_measures[0],
+        list_relevant_measures,
+        string_reference_model,
+        string_dataset,
+        string_diagram_type,
+        string_mid_type,
+        tuple_dbscan_parameters=(
+            float_eps,
+            int_min_pts,
+            dict_view_state["list_dbscan_parameters"][2],
+        ),
+    )
+
+    # The axes of the overview stay as they are, only its points change. This
+    # also removes the Selection trace
+    chart_left_updated = Patch()
+    chart_left_updated["data"] = figure_spec.dict_validated(chart_left)["data"]
+    chart_left_updated["layout"]["coloraxis"] = chart_left["layout"][
+        "coloraxis"
+    ]
+
+    # The legend groups of the detail diagram follow the new clusters, but
+    # only for models that changed their cluster. Packed detail diagrams keep
+    # the clusters they were drawn with
+    chart_right_updated = Patch()
+    dict_new_index = _dict_align_cluster_index(
+        dict_cluster_index, dict_view_state["list_model_names"]
+    )
+    if not dict_view_state["bool_packed"]:
+        np_old_clusters = np.asarray(dict_view_state["list_cluster_names"])[
+            dict_view_state["list_model_clusters"]
+        ]
+        np_new_clusters = np.asarray(dict_new_index["list_cluster_names"])[
+            dict_new_index["list_model_clusters"]
+        ]
+        for int_i in np.flatnonzero(
+            np_old_clusters != np_new_clusters
+        ).tolist():
+            string_model = dict_view_state["list_model_names"][int_i]
+            string_cluster = str(np_new_clusters[int_i])
+            chart_right_updated["data"][int_i]["legendgroup"] = string_cluster
+            chart_right_updated["data"][int_i]["legendgrouptitle"] = {
+                "text": string_cluster
+                if string_cluster != string_model
+                else None
+            }
+
+    dict_view_state.update(dict_new_index)
+    dict_view_state["list_dbscan_parameters"] = list(tuple_dbscan_parameters)
+    dict_view_state["int_left_traces"] = len(chart_left["data"])
+    session_store.update_session(
+        string_session_id,
+        {"view_state": dict_view_state, "bool_left_selection": False},
+    )
+
+    return (
+        chart_left_updated,
+        figure_spec.dict_validated(chart_left_size_legend),
+        chart_right_updated,
+    )
+
+
+# Legend clicks only change the visibility of traces, so the 1D projections
+# are synchronized in the browser (assets/polar_legends.js)
+clientside_callback(
+    ClientsideFunction(
+        namespace="polar_legends", function_name="sync_projections"
+    ),
+    Output(
+        component_id="chart-left-projections",
+        component_property="figure",
+        allow_duplicate=True,
+    ),
+    Output("store-legend-visible", "data", allow_duplicate=True),
+    Input(component_id="chart-right", component_property="restyleData"),
+    State("chart-left-projections", "figure"),
+    State("store-legend-visible", "data"),
+    prevent_initial_call=True,
+)
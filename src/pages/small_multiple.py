@@ -1,12 +1,29 @@
 import os
-import warnings
+import re
 
 import dash_bootstrap_components as dbc
-import pandas as pd
-import polar_diagrams
-from dash import Input, Output, Patch, State, callback, dcc, html
+from dash import (
+    ALL,
+    ClientsideFunction,
+    Input,
+    Output,
+    State,
+    clientside_callback,
+    dcc,
+    html,
+)
 from dash.exceptions import PreventUpdate
 
+from utils import (
+    background_jobs,
+    diagnostics,
+    diagram_builder,
+    process_pool,
+    property_cache,
+    registry,
+    session_store,
+)
+
 _INT_CHART_WIDTH = 1400
 _INT_CHART_HEIGHT = 500
 _INT_TICK_SIZE = 9
@@ -18,63 +35,46 @@ _DICT_FIGURE_SAVE_CONFIG = {
 }
 _STRING_DIAGRAM_TYPE = "taylor"
 _STRING_MID_TYPE = "normalized"
-_DF_INPUT = None
-_STRING_REFERENCE_MODEL = "True"
-_LIST_PRETTY_NAMES = None
+# Every pair of consecutive files is one diagram, and one page shows 2 rows
+# of 3 diagrams. Only the diagrams of the shown page are computed
+_INT_CHARTS_PER_ROW = 3
+_INT_CHARTS_PER_PAGE = 6
+_STRING_CHART_TYPE = "small-multiple-chart"
+# Finished charts per (case study, diagram type, MID type, reference model,
+# page)
+_CACHE_CHARTS = background_jobs.cache_create(
+    "small_multiple_charts",
+    int(os.environ.get("POLAR_FIGURE_CACHE_ENTRIES", "32")),
+)
+_DICT_BUNDLE_CHARTS = {}
 
 
 def _chart_warning_create(
-    df_input, string_reference_model, string_diagram_type, string_mid_type
+    list_df_measures,
+    string_reference_model,
+    string_diagram_type,
+    string_mid_type,
 ):
-    # We monkey patch the function that prints the warnings so that it doesn't
-    # require some inputs and only returns the warning message that we need
-    warnings.formatwarning = lambda msg, *args, **kwargs: str(msg)
-
-    if string_diagram_type == "mid":
-        with warnings.catch_warnings(record=True) as warning_tmp:
-            # Cause all warnings to always be triggered.
-            warnings.simplefilter("default")
-            chart_result = polar_diagrams.chart_create_mi_diagram(
-                df_input,
-                string_reference_model=string_reference_model,
-                string_mid_type=string_mid_type,
-            )
-
-            list_warning_caught = warning_tmp
-    else:
-        with warnings.catch_warnings(record=True) as warning_tmp:
-            # Cause all warnings to always be triggered.
-            warnings.simplefilter("default")
-            chart_result = polar_diagrams.chart_create_taylor_diagram(
-                df_input, string_reference_model=string_reference_model
-            )
-
-            list_warning_caught = warning_tmp
+    with diagnostics.collect() as list_warning_caught:
+        chart_result = diagram_builder.chart_create_diagram(
+            list_df_measures,
+            string_reference_model,
+            string_diagram_type,
+            string_mid_type,
+        )
 
     list_warnings = []
-    int_i = 1
-    for warning_tmp in list_warning_caught:
-        if "RuntimeWarning" in warnings.formatwarning(warning_tmp):
-            string_one_warning = (
-                " "
-                + warnings
-                .formatwarning(warning_tmp)[11:]
-                .split(").")[0]
-                .replace("\\n", " ")
-                + ")."
-            )
-            if string_one_warning in list_warnings:
-                continue
-            else:
-                list_warnings += [
-                    html.I(
-                        className="fa-solid fa-triangle-exclamation",
-                        style={"margin-top": 3},
-                    ),
-                    string_one_warning,
-                    html.Br(),
-                ]
-                int_i += 1
+    for string_message in diagnostics.list_runtime_messages(
+        list_warning_caught
+    ):
+        list_warnings += [
+            html.I(
+                className="fa-solid fa-triangle-exclamation",
+                style={"margin-top": 3},
+            ),
+            " " + string_message,
+            html.Br(),
+        ]
 
     chart_result.update_layout(
         showlegend=False,
@@ -98,28 +98,118 @@ def _chart_warning_create(
     return chart_result, list_warnings
 
 
-def _list_create_rows(
+def _dict_create_cell(
+    list_df_measures,
+    string_hyperparam_info,
+    bool_legend,
+    string_reference_model,
+    string_diagram_type,
+    string_mid_type,
+):
+    # One diagram of the grid, computed in a process of the pool. It returns
+    # a plain figure, which is much cheaper to send back than a plotly figure
+    chart_result, _ = _chart_warning_create(
+        list_df_measures,
+        string_reference_model,
+        string_diagram_type,
+        string_mid_type,
+    )
+    chart_result.add_annotation(
+        {
+            "x": 1,
+            "y": 1.2,
+            "xref": "paper",
+            "yref": "paper",
+            "showarrow": False,
+            "text": string_hyperparam_info,
+            "font": {"size": _INT_TICK_SIZE, "color": "black"},
+        }
+    )
+
+    if bool_legend:
+        chart_result.update_layout(
+            height=_INT_CHART_HEIGHT - 50,
+            showlegend=True,
+            legend_xref="paper",
+            legend_yref="paper",
+            legend_xanchor="left",
+            legend_yanchor="bottom",
+            legend_orientation="h",
+            legend_y=-0.8,
+        )
+
+    return chart_result.to_plotly_json()
+
+
+def _int_page_count(list_pretty_names):
+    return max(
+        1,
+        -(-(len(list_pretty_names) - 1) // _INT_CHARTS_PER_PAGE),
+    )
+
+
+def _list_create_charts(
     df_input,
+    list_pretty_names,
     string_reference_model,
+    dict_mi_parameters,
     string_diagram_type="taylor",
     string_mid_type="scaled",
+    int_page=1,
 ):
 
-    list_rows = []
-    list_row = []
+    list_arguments = []
+    # The page needs one file more than it has diagrams
+    int_start = (int_page - 1) * _INT_CHARTS_PER_PAGE
+    df_input = df_input[int_start : int_start + _INT_CHARTS_PER_PAGE + 1]
+    list_pretty_names = list_pretty_names[
+        int_start : int_start + _INT_CHARTS_PER_PAGE + 1
+    ]
     list_tuple_pretty_names = list(
-        zip(_LIST_PRETTY_NAMES, _LIST_PRETTY_NAMES[1:])
+        zip(list_pretty_names, list_pretty_names[1:])
     )
 
-    for int_i, tuple_dfs in enumerate(list(zip(df_input, df_input[1:]))):
-        if int_i % 3 == 0:
-            list_rows.append(dbc.Row(list_row, id="Row_" + str(int_i / 4)))
-            list_row = []
-
-        # We only want to show 2 rows of 3 diagrams
-        if int_i == 6:
-            break
-
+    # Neighboring diagrams share a file, so every file is measured once and
+    # the diagrams are assembled from its property table. The tables are
+    # cached, and both MID types share the same ones. The cache is looked up
+    # here, and only the missing tables are estimated in the pool and then
+    # stored by this process, whose cache the next pages read
+    background_jobs.report_progress("measures")
+    list_measure_arguments = [
+        (
+            df_one,
+            string_reference_model,
+            string_diagram_type,
+            dict_mi_parameters,
+        )
+        for df_one in df_input
+    ]
+    list_keys = [
+        property_cache.string_properties_key(*tuple_args)
+        for tuple_args in list_measure_arguments
+    ]
+    list_df_measures = [
+        property_cache.df_cached_properties(string_key)
+        for string_key in list_keys
+    ]
+    list_missing = [
+        int_i
+        for int_i, df_measures in enumerate(list_df_measures)
+        if df_measures is None
+    ]
+    for int_i, df_measures in zip(
+        list_missing,
+        process_pool.list_map(
+            property_cache.df_estimate_properties,
+            [list_measure_arguments[int_i] for int_i in list_missing],
+        ),
+    ):
+        property_cache.store_properties(list_keys[int_i], df_measures)
+        list_df_measures[int_i] = df_measures.copy()
+
+    for int_i, tuple_dfs in enumerate(
+        list(zip(list_df_measures, list_df_measures[1:]))
+    ):
         string_hyperparam_info = (
             "Version 0 ("
             + list_tuple_pretty_names[int_i][0]
@@ -129,117 +219,291 @@ def _list_create_rows(
             + ")"
         )
 
-        chart_result, list_warnings = _chart_warning_create(
-            list(tuple_dfs),
+        list_arguments.append(
+            (
+                list(tuple_dfs),
+                string_hyperparam_info,
+                # The first diagram of the second row shows the legend
+                int_i == _INT_CHARTS_PER_ROW,
+                string_reference_model,
+                string_diagram_type,
+                string_mid_type,
+            )
+        )
+
+    # The diagrams are independent, so the grid takes about as long as its
+    # slowest diagram when the pool has a process for each of them
+    background_jobs.report_progress("figures")
+    return process_pool.list_map(_dict_create_cell, list_arguments)
+
+
+def _list_create_rows(list_charts):
+    # The last page can have fewer diagrams. Its empty places are kept, but
+    # hidden, so the grid keeps its shape
+    list_charts = list(list_charts) + [{}] * (
+        _INT_CHARTS_PER_PAGE - len(list_charts)
+    )
+    list_rows = []
+    list_row = []
+    for int_i, chart_result in enumerate(list_charts):
+        if int_i % _INT_CHARTS_PER_ROW == 0:
+            list_rows.append(dbc.Row(list_row, id="Row_" + str(int_i / 4)))
+            list_row = []
+
+        list_row.append(_col_create_chart(int_i, chart_result))
+
+    list_rows.append(dbc.Row(list_row, id="Row_" + str(len(list_charts) / 4)))
+
+    return list_rows
+
+
+def _col_create_chart(int_i, chart_result):
+    return dbc.Col(
+        [
+            dcc.Graph(
+                id={"type": _STRING_CHART_TYPE, "index": int_i},
+                figure=chart_result,
+                config={
+                    "toImageButtonOptions": _DICT_FIGURE_SAVE_CONFIG,
+                    "modeBarButtonsToRemove": [
+                        "zoom",
+                        "pan",
+                        "lasso",
+                        "zoomIn",
+                        "zoomOut",
+                        "select",
+                        "autoScale",
+                        "resetScale",
+                    ],
+                    "displaylogo": False,
+                    "showAxisDragHandles": False,
+                },
+                style={
+                    "margin-bottom": 0,
+                    "margin-top": 0,
+                    "margin-left": 0,
+                    "margin-right": 0,
+                },
+            ),
+        ],
+        width=12 // _INT_CHARTS_PER_ROW,
+        align="start",
+        style={
+            "margin-left": 0,
+            "margin-right": 0,
+            "visibility": "visible" if chart_result else "hidden",
+        },
+    )
+
+
+def _list_create_rows_cached(
+    string_case_study,
+    string_diagram_type="taylor",
+    string_mid_type="scaled",
+    int_page=1,
+):
+    background_jobs.report_progress("load")
+    (
+        df_input,
+        list_pretty_names,
+        string_reference_model,
+        string_dataset,
+        dict_mi_parameters,
+    ) = _tuple_get_case_study(string_case_study)
+
+    tuple_key = (
+        string_dataset,
+        string_diagram_type,
+        string_mid_type if string_diagram_type == "mid" else None,
+        string_reference_model,
+        min(max(int_page, 1), _int_page_count(list_pretty_names)),
+    )
+
+    # Precomputed charts from the artifact bundle are used before the LRU
+    list_charts = _DICT_BUNDLE_CHARTS.get(tuple_key)
+    if list_charts is None:
+        list_charts = _CACHE_CHARTS.get(tuple_key)
+    if list_charts is None:
+        list_charts = _list_create_charts(
+            df_input,
+            list_pretty_names,
             string_reference_model,
+            dict_mi_parameters,
             string_diagram_type,
             string_mid_type,
+            tuple_key[-1],
         )
-        chart_result.add_annotation(
-            dict(
-                x=1,
-                y=1.2,
-                xref="paper",
-                yref="paper",
-                showarrow=False,
-                text=string_hyperparam_info,
-                font=dict(size=_INT_TICK_SIZE, color="black"),
-            )
+        _CACHE_CHARTS.set(tuple_key, list_charts)
+
+    return _list_create_rows(list_charts)
+
+
+def _list_export_bundle_views(string_case_study, list_views):
+    # The first page of every view of the small multiple is computed live and
+    # returned in a JSON serializable form for the artifact bundle. Other
+    # pages are computed when they are opened
+    (
+        df_input,
+        list_pretty_names,
+        string_reference_model,
+        string_dataset,
+        dict_mi_parameters,
+    ) = _tuple_get_case_study(string_case_study)
+
+    list_result = []
+    for string_diagram_type, string_mid_type in list_views:
+        list_charts = _list_create_charts(
+            df_input,
+            list_pretty_names,
+            string_reference_model,
+            dict_mi_parameters,
+            string_diagram_type,
+            string_mid_type,
+        )
+        list_result.append(
+            {
+                "dataset": string_dataset,
+                "diagram_type": string_diagram_type,
+                "mid_type": string_mid_type,
+                "reference_model": string_reference_model,
+                "figures": list_charts,
+            }
         )
 
-        if int_i == 3:
-            chart_result.update_layout(
-                height=_INT_CHART_HEIGHT - 50,
-                showlegend=True,
-                legend_xref="paper",
-                legend_yref="paper",
-                legend_xanchor="left",
-                legend_yanchor="bottom",
-                legend_orientation="h",
-                legend_y=-0.8,
-            )
+    return list_result
 
-        list_row.append(
-            dbc.Col(
-                [
-                    dcc.Graph(
-                        id="chart_" + str(int_i),
-                        figure=chart_result,
-                        config={
-                            "toImageButtonOptions": _DICT_FIGURE_SAVE_CONFIG,
-                            "modeBarButtonsToRemove": [
-                                "zoom",
-                                "pan",
-                                "lasso",
-                                "zoomIn",
-                                "zoomOut",
-                                "select",
-                                "autoScale",
-                                "resetScale",
-                            ],
-                            "displaylogo": False,
-                            "showAxisDragHandles": False,
-                        },
-                        style={
-                            "margin-bottom": 0,
-                            "margin-top": 0,
-                            "margin-left": 0,
-                            "margin-right": 0,
-                        },
-                    ),
-                ],
-                width=4,
-                align="start",
-                style={"margin-left": 0, "margin-right": 0},
-            )
-        )
 
-    return list_rows
+def _import_bundle_views(list_views):
+    # The bundle only holds the first page of every view
+    for dict_view in list_views:
+        tuple_key = (
+            dict_view["dataset"],
+            dict_view["diagram_type"],
+            dict_view["mid_type"],
+            dict_view["reference_model"],
+            1,
+        )
+        _DICT_BUNDLE_CHARTS[tuple_key] = dict_view["figures"]
 
 
-def _layout_return():
-    global _STRING_DIAGRAM_TYPE, _STRING_MID_TYPE, _DF_INPUT
-    global _STRING_REFERENCE_MODEL, _LIST_PRETTY_NAMES
+def _string_pretty_name(path_file):
+    string_file_name = os.path.basename(path_file)
+    # Gaussian process results are named after their hyperparameters, other
+    # data sets simply use the file name
+    re_match = re.search(r"F([\d.]+)_sigmaL([\d.]+)_", string_file_name)
+    if re_match is None:
+        return os.path.splitext(string_file_name)[0]
 
-    path_gp_data = os.path.join(
-        "..", "data", "Case_Study_Gaussian_Processes", "results_agent1"
-    )
-    list_csv_files = os.listdir(path_gp_data)
-    _DF_INPUT = [
-        pd.read_csv(os.path.join(path_gp_data, i)) for i in list_csv_files
-    ]
-    _LIST_PRETTY_NAMES = [
+    return (
         "σ_F: <b>"
-        + i.split("_")[0][-3:]
+        + re_match.group(1)
         + "</b>, "
         + "σ_L: <b>"
-        + i.split("_")[1][-3:]
+        + re_match.group(2)
         + "</b>"
-        for i in list_csv_files
-    ]
+    )
+
+
+def _tuple_get_case_study(string_case_study):
+    # Case studies are loaded once per process by the registry, so every
+    # session and worker can look them up instead of keeping module globals
+    dict_case_study = registry.dict_get_case_study(string_case_study)
+    list_paths, list_df_input = registry.tuple_load_case_study(
+        string_case_study
+    )
+
+    return (
+        list_df_input,
+        [_string_pretty_name(i) for i in list_paths],
+        dict_case_study["reference_model"],
+        dict_case_study["dataset"],
+        dict_case_study["mi_parameters"],
+    )
 
-    list_rows = _list_create_rows(
-        _DF_INPUT,
-        _STRING_REFERENCE_MODEL,
+
+def _layout_return(string_case_study, string_session_id):
+    # The diagram type callback reads the shown case study from the session
+    session_store.update_session(
+        string_session_id, {"case_study": string_case_study}
+    )
+
+    list_rows = _list_create_rows_cached(
+        string_case_study,
         _STRING_DIAGRAM_TYPE,
         _STRING_MID_TYPE,
     )
 
-    layout = dbc.Container(list_rows, id="small_multiple_rows", fluid=True)
+    layout = dbc.Container(
+        [
+            dbc.Container(list_rows, id="small_multiple_rows", fluid=True),
+            _row_create_pagination(
+                _int_page_count(_tuple_get_case_study(string_case_study)[1])
+            ),
+        ],
+        fluid=True,
+    )
 
     return layout
 
 
-@callback(
+def _row_create_pagination(int_page_count):
+    # Pages are only offered when there are more diagrams than fit on one
+    return dbc.Row(
+        dbc.Pagination(
+            id="small-multiple-page",
+            max_value=int_page_count,
+            active_page=1,
+            fully_expanded=False,
+            previous_next=True,
+        ),
+        justify="center",
+        style={"display": "flex" if int_page_count > 1 else "none"},
+    )
+
+
+def _layout_skeleton():
+    # The skeleton only declares the component IDs used by the callbacks, so
+    # it can serve as a validation layout without reading or computing data
+    list_cols = [
+        _col_create_chart(int_i, {}) for int_i in range(_INT_CHARTS_PER_PAGE)
+    ]
+
+    return dbc.Container(
+        [
+            dbc.Container(
+                [
+                    dbc.Row(list_cols[:_INT_CHARTS_PER_ROW]),
+                    dbc.Row(list_cols[_INT_CHARTS_PER_ROW:]),
+                ],
+                id="small_multiple_rows",
+                fluid=True,
+            ),
+            _row_create_pagination(1),
+        ],
+        fluid=True,
+    )
+
+
+@background_jobs.callback(
     Output(
         component_id="small_multiple_rows",
         component_property="children",
         allow_duplicate=True,
     ),
     Input("selected-diagram-type", "value"),
+    Input("small-multiple-page", "active_page"),
+    State("session-id", "data"),
     prevent_initial_call=True,
 )
-def update_output(string_selected_diagram_type):
+def update_output(
+    string_selected_diagram_type, int_active_page, string_session_id
+):
+    string_case_study = session_store.dict_get_session(string_session_id).get(
+        "case_study"
+    )
+    if string_case_study is None:
+        raise PreventUpdate
+
     if string_selected_diagram_type == "taylor":
         string_diagram_type = "taylor"
         string_mid_type = None
@@ -250,88 +514,30 @@ def update_output(string_selected_diagram_type):
         string_diagram_type = "mid"
         string_mid_type = "normalized"
 
-    list_rows = _list_create_rows(
-        _DF_INPUT, _STRING_REFERENCE_MODEL, string_diagram_type, string_mid_type
+    list_rows = _list_create_rows_cached(
+        string_case_study,
+        string_diagram_type,
+        string_mid_type,
+        int_active_page or 1,
     )
 
     return list_rows
 
 
-@callback(
-    Output(
-        component_id="chart_0",
-        component_property="figure",
-        allow_duplicate=True,
+# Legend clicks only change the visibility of traces, so the other small
+# multiples are restyled in the browser (assets/polar_legends.js). The charts
+# are matched by their type, so any number of them is synchronized
+clientside_callback(
+    ClientsideFunction(
+        namespace="polar_legends", function_name="sync_small_multiples"
     ),
     Output(
-        component_id="chart_1",
+        component_id={"type": _STRING_CHART_TYPE, "index": ALL},
         component_property="figure",
-        allow_duplicate=True,
     ),
-    Output(
-        component_id="chart_2",
-        component_property="figure",
-        allow_duplicate=True,
-    ),
-    Output(
-        component_id="chart_4",
-        component_property="figure",
-        allow_duplicate=True,
+    Input(
+        component_id={"type": _STRING_CHART_TYPE, "index": ALL},
+        component_property="restyleData",
     ),
-    Output(
-        component_id="chart_5",
-        component_property="figure",
-        allow_duplicate=True,
-    ),
-    Input(component_id="chart_3", component_property="restyleData"),
-    State("chart_0", "figure"),
-    State("chart_1", "figure"),
-    State("chart_2", "figure"),
-    State("chart_3", "figure"),
-    State("chart_4", "figure"),
-    State("chart_5", "figure"),
     prevent_initial_call=True,
 )
-def _list_update_legends(
-    list_legend_points, dict_0, dict_1, dict_2, dict_3, dict_4, dict_5
-):
-
-    chart_0 = Patch()
-    chart_1 = Patch()
-    chart_2 = Patch()
-    chart_4 = Patch()
-    chart_5 = Patch()
-
-    # We check if we have an event and if the click was not empty
-    if list_legend_points and list_legend_points[0]:
-        # ----- One legend click gives the following output:
-        # [{"visible": ["legendonly"]}, [10]]
-        # [{"visible": [true]}, [1]]
-        # ----- Group click:
-        # [{'visible': ['legendonly', 'legendonly', True, True, 'legendonly',
-        #               'legendonly', 'legendonly', 'legendonly', 'legendonly',
-        #               'legendonly', 'legendonly', 'legendonly']},
-        #  [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]]
-        # ----- Empty legend click:
-        # [{}, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]]
-        if list_legend_points:
-            for int_i, int_legend_point in enumerate(list_legend_points[1]):
-                if (
-                    isinstance(list_legend_points[0]["visible"][int_i], bool)
-                    and list_legend_points[0]["visible"][int_i]
-                ):
-                    chart_0["data"][int_legend_point]["visible"] = True
-                    chart_1["data"][int_legend_point]["visible"] = True
-                    chart_2["data"][int_legend_point]["visible"] = True
-                    chart_4["data"][int_legend_point]["visible"] = True
-                    chart_5["data"][int_legend_point]["visible"] = True
-                else:
-                    chart_0["data"][int_legend_point]["visible"] = False
-                    chart_1["data"][int_legend_point]["visible"] = False
-                    chart_2["data"][int_legend_point]["visible"] = False
-                    chart_4["data"][int_legend_point]["visible"] = False
-                    chart_5["data"][int_legend_point]["visible"] = False
-    else:
-        raise PreventUpdate
-
-    return chart_0, chart_1, chart_2, chart_4, chart_5
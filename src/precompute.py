@@ -0,0 +1,51 @@
+import argparse
+
+from pages import overview_detail, small_multiple
+from utils import artifact_bundle, registry
+
+# Every diagram type and MID variant offered by the "Select diagram" dropdown
+_LIST_VIEWS = [("taylor", None), ("mid", "scaled"), ("mid", "normalized")]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute the measure tables, cluster labels and "
+        + "figures of every case study into a versioned artifact bundle "
+        + "that the dashboard loads at startup."
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Directory of the artifact bundles (default: ../artifacts or "
+        + "POLAR_BUNDLE_DIR).",
+    )
+    parser.add_argument(
+        "--keep-old",
+        action="store_true",
+        help="Keep bundles of older data or code versions.",
+    )
+    args = parser.parse_args()
+
+    dict_pages = {"overview_detail": [], "small_multiple": []}
+    for dict_case_study in registry.list_case_studies("overview_detail"):
+        dict_pages["overview_detail"] += (
+            overview_detail._list_export_bundle_views(
+                dict_case_study["id"], _LIST_VIEWS
+            )
+        )
+
+    for dict_case_study in registry.list_case_studies("small_multiple"):
+        dict_pages["small_multiple"] += (
+            small_multiple._list_export_bundle_views(
+                dict_case_study["id"], _LIST_VIEWS
+            )
+        )
+
+    path_bundle = artifact_bundle.path_write_bundle(
+        dict_pages, path_output=args.output, bool_keep_old=args.keep_old
+    )
+    print("Artifact bundle written to " + path_bundle)
+
+
+if __name__ == "__main__":
+    main()
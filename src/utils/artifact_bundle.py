@@ -0,0 +1,202 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import plotly
+import polar_diagrams
+
+from utils import property_cache, registry
+
+# Bump this value whenever the layout of the bundle changes
+_INT_BUNDLE_FORMAT_VERSION = 2
+_PATH_BUNDLE_DIR = os.environ.get(
+    "POLAR_BUNDLE_DIR", os.path.join("..", "artifacts")
+)
+_PATH_SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_STRING_MANIFEST_NAME = "manifest.json"
+
+
+def string_bundle_version():
+    # The version covers the bundle format, the polar_diagrams version, the
+    # case study registry, every file it lists and the dashboard code that
+    # builds the figures, so any change to one of them makes an existing
+    # bundle stale
+    hash_result = hashlib.sha256()
+    hash_result.update(str(_INT_BUNDLE_FORMAT_VERSION).encode())
+    hash_result.update(polar_diagrams.__version__.encode())
+
+    list_paths = [registry.path_registry()]
+    list_paths += sorted(registry.list_all_paths()) + sorted(
+        glob.glob(os.path.join(_PATH_SOURCE_DIR, "pages", "*.py"))
+        + glob.glob(os.path.join(_PATH_SOURCE_DIR, "utils", "*.py"))
+    )
+    for path_file in list_paths:
+        hash_result.update(os.path.basename(path_file).encode())
+        with open(path_file, "rb") as file_input:
+            hash_result.update(file_input.read())
+
+    return hash_result.hexdigest()[:16]
+
+
+def _string_view_dir(string_page, dict_view):
+    string_view = dict_view["diagram_type"]
+    if dict_view["mid_type"]:
+        string_view += "_" + dict_view["mid_type"]
+
+    return os.path.join(string_page, dict_view["dataset"], string_view)
+
+
+def _dict_cluster_labels(dict_state):
+    # We store the cluster of every model, which the dashboard keeps as one
+    # cluster number per model of the detail diagram
+    list_cluster_names = dict_state.get("list_cluster_names", [])
+
+    return {
+        string_model: list_cluster_names[int_cluster]
+        for string_model, int_cluster in zip(
+            dict_state.get("list_model_names", []),
+            dict_state.get("list_model_clusters", []),
+        )
+    }
+
+
+def _write_json(path_file, object_value):
+    with open(path_file, "w", encoding="utf-8") as file_output:
+        json.dump(
+            object_value, file_output, cls=plotly.utils.PlotlyJSONEncoder
+        )
+
+
+def path_write_bundle(dict_pages, path_output=None, bool_keep_old=False):
+    path_output = path_output or _PATH_BUNDLE_DIR
+    string_version = string_bundle_version()
+    os.makedirs(path_output, exist_ok=True)
+
+    # The bundle is written to a temporary directory and renamed at the end,
+    # so a running dashboard never reads a half written bundle
+    path_tmp = tempfile.mkdtemp(dir=path_output, prefix=".tmp_")
+    dict_manifest = {
+        "format": _INT_BUNDLE_FORMAT_VERSION,
+        "version": string_version,
+        "polar_diagrams": polar_diagrams.__version__,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "views": [],
+    }
+    for string_page, list_views in dict_pages.items():
+        for dict_view in list_views:
+            string_view_dir = _string_view_dir(string_page, dict_view)
+            os.makedirs(os.path.join(path_tmp, string_view_dir))
+
+            _write_json(
+                os.path.join(path_tmp, string_view_dir, "figures.json"),
+                dict_view["figures"],
+            )
+            _write_json(
+                os.path.join(path_tmp, string_view_dir, "state.json"),
+                {
+                    "warnings": dict_view.get("warnings", []),
+                    "state": dict_view.get("state", {}),
+                },
+            )
+            if "state" in dict_view:
+                _write_json(
+                    os.path.join(path_tmp, string_view_dir, "labels.json"),
+                    _dict_cluster_labels(dict_view["state"]),
+                )
+            if "measures" in dict_view:
+                with open(
+                    os.path.join(path_tmp, string_view_dir, "measures.pkl"),
+                    "wb",
+                ) as file_output:
+                    pickle.dump(dict_view["measures"], file_output)
+
+            dict_manifest["views"].append(
+                {
+                    "page": string_page,
+                    "path": string_view_dir,
+                    "dataset": dict_view["dataset"],
+                    "diagram_type": dict_view["diagram_type"],
+                    "mid_type": dict_view["mid_type"],
+                    "reference_model": dict_view["reference_model"],
+                    "measures_key": dict_view.get("measures_key"),
+                }
+            )
+
+    _write_json(os.path.join(path_tmp, _STRING_MANIFEST_NAME), dict_manifest)
+
+    path_bundle = os.path.join(path_output, string_version)
+    if os.path.isdir(path_bundle):
+        shutil.rmtree(path_bundle)
+    os.rename(path_tmp, path_bundle)
+
+    if not bool_keep_old:
+        for dir_entry in os.scandir(path_output):
+            if dir_entry.is_dir() and dir_entry.path != path_bundle:
+                shutil.rmtree(dir_entry.path, ignore_errors=True)
+
+    return path_bundle
+
+
+def dict_read_bundle(path_input=None):
+    path_input = path_input or _PATH_BUNDLE_DIR
+    string_version = string_bundle_version()
+    path_bundle = os.path.join(path_input, string_version)
+    path_manifest = os.path.join(path_bundle, _STRING_MANIFEST_NAME)
+
+    if not os.path.isfile(path_manifest):
+        if os.path.isdir(path_input) and os.listdir(path_input):
+            print(
+                "Artifact bundle in " + path_input + " is stale (expected "
+                "version " + string_version + "), computing diagrams live.\n"
+            )
+        return {}
+
+    with open(path_manifest, encoding="utf-8") as file_input:
+        dict_manifest = json.load(file_input)
+
+    dict_pages = {}
+    for dict_entry in dict_manifest["views"]:
+        path_view = os.path.join(path_bundle, dict_entry["path"])
+        with open(
+            os.path.join(path_view, "figures.json"), encoding="utf-8"
+        ) as file_input:
+            list_figures = json.load(file_input)
+        with open(
+            os.path.join(path_view, "state.json"), encoding="utf-8"
+        ) as file_input:
+            dict_state = json.load(file_input)
+        # The measure tables go into the property cache, so that clustering
+        # the models again with the DBSCAN sliders never estimates them live
+        path_measures = os.path.join(path_view, "measures.pkl")
+        if dict_entry.get("measures_key") and os.path.isfile(path_measures):
+            with open(path_measures, "rb") as file_input:
+                property_cache.store_properties(
+                    dict_entry["measures_key"], pickle.load(file_input)
+                )
+
+        dict_pages.setdefault(dict_entry["page"], []).append(
+            {
+                "dataset": dict_entry["dataset"],
+                "diagram_type": dict_entry["diagram_type"],
+                "mid_type": dict_entry["mid_type"],
+                "reference_model": dict_entry["reference_model"],
+                "figures": list_figures,
+                "warnings": dict_state["warnings"],
+                "state": dict_state["state"],
+            }
+        )
+
+    print(
+        "Loaded artifact bundle "
+        + string_version
+        + " with "
+        + str(len(dict_manifest["views"]))
+        + " views.\n"
+    )
+
+    return dict_pages
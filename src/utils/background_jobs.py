@@ -0,0 +1,127 @@
+import contextvars
+import functools
+import os
+
+from dash import Input, Output
+from dash import callback as dash_callback
+
+from utils import session_store
+from utils.lru_cache import LRUCache
+from utils.shared_cache import SharedCache
+
+# With POLAR_BACKGROUND_JOBS=1 the callbacks that build whole diagrams run as
+# Dash background callbacks. Every job is a process of its own, forked from
+# the web worker, which only polls the job and stays free for other users.
+# Jobs are kept in a local diskcache in POLAR_JOB_DIR, so no broker is needed
+_BOOL_BACKGROUND_JOBS = os.environ.get("POLAR_BACKGROUND_JOBS", "0") == "1"
+_PATH_JOB_DIR = os.environ.get(
+    "POLAR_JOB_DIR", os.path.join("..", "cache", "jobs")
+)
+# Jobs fill the figure and measure caches of the pages in processes of
+# their own, so those caches also keep their entries in POLAR_SHARED_CACHE_DIR,
+# where the web worker and later jobs find them
+_PATH_SHARED_CACHE_DIR = os.environ.get(
+    "POLAR_SHARED_CACHE_DIR", os.path.join("..", "cache", "shared")
+)
+_INT_SHARED_CACHE_MAX_BYTES = int(
+    os.environ.get("POLAR_SHARED_CACHE_BYTES", str(256 * 1024**2))
+)
+# Milliseconds between two polls of a running job
+_INT_POLL_INTERVAL = int(os.environ.get("POLAR_JOB_POLL_INTERVAL", "500"))
+# Progress in percent at the start of every stage of a diagram build
+_DICT_STAGES = {
+    "load": (5, "Loading data"),
+    "measures": (20, "Estimating measures"),
+    "clustering": (50, "Clustering models"),
+    "figures": (75, "Building figures"),
+}
+_CONTEXT_PROGRESS = contextvars.ContextVar("function_progress", default=None)
+_MANAGER = None
+
+if _BOOL_BACKGROUND_JOBS:
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+    except ImportError as error:
+        raise ImportError(
+            "POLAR_BACKGROUND_JOBS needs diskcache, multiprocess and psutil, "
+            + "install dash[diskcache]"
+        ) from error
+    # The jobs write the state of their session, which the memory backend
+    # would only keep inside the job process
+    if session_store.string_backend() != "file":
+        raise ValueError(
+            "POLAR_BACKGROUND_JOBS needs POLAR_SESSION_BACKEND=file, "
+            + "because every job runs in a process of its own"
+        )
+    _MANAGER = DiskcacheManager(diskcache.Cache(_PATH_JOB_DIR))
+
+
+def cache_create(string_name, int_max_entries):
+    # A cache of finished results of the pages. Without background jobs it
+    # only lives in the web worker, with them every cache has a directory of
+    # its own in POLAR_SHARED_CACHE_DIR, bounded by POLAR_SHARED_CACHE_BYTES
+    if _MANAGER is None:
+        return LRUCache(int_max_entries)
+
+    return SharedCache(
+        int_max_entries,
+        os.path.join(_PATH_SHARED_CACHE_DIR, string_name),
+        _INT_SHARED_CACHE_MAX_BYTES,
+    )
+
+
+def report_progress(string_stage):
+    # Stages are only reported inside a background job, everywhere else this
+    # does nothing
+    function_progress = _CONTEXT_PROGRESS.get()
+    if function_progress is not None:
+        int_percent, string_label = _DICT_STAGES[string_stage]
+        function_progress((int_percent, string_label))
+
+
+def callback(
+    *list_dependencies, bool_cancel_on_case_study=True, **dict_arguments
+):
+    # A drop-in for dash.callback. Background callbacks show their progress in
+    # the progress bar of the page, and their jobs are cancelled when another
+    # case study is chosen, because their result is not shown anymore. Dash
+    # also cancels a job by itself when its callback is triggered again
+    if _MANAGER is None:
+        return dash_callback(*list_dependencies, **dict_arguments)
+
+    def decorator(function_callback):
+        @functools.wraps(function_callback)
+        def function_job(function_progress, *list_args):
+            token_progress = _CONTEXT_PROGRESS.set(function_progress)
+            try:
+                return function_callback(*list_args)
+            finally:
+                _CONTEXT_PROGRESS.reset(token_progress)
+
+        return dash_callback(
+            *list_dependencies,
+            background=True,
+            manager=_MANAGER,
+            interval=_INT_POLL_INTERVAL,
+            progress=[
+                Output("progress-job", "value"),
+                Output("progress-job", "label"),
+            ],
+            progress_default=[0, ""],
+            cancel=(
+                [Input("radio_button", "value")]
+                if bool_cancel_on_case_study
+                else None
+            ),
+            running=[
+                (
+                    Output("row-progress-job", "style"),
+                    {"display": "flex"},
+                    {"display": "none"},
+                ),
+            ],
+            **dict_arguments,
+        )(function_job)
+
+    return decorator
@@ -0,0 +1,293 @@
+import hashlib
+import os
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import DBSCAN
+from sklearn.metrics import adjusted_rand_score
+from sklearn.neighbors import KDTree, NearestNeighbors
+
+from utils.lru_cache import LRUCache
+
+# Radius neighbor graphs bounded by their number of stored distances. A
+# graph, or an exact DBSCAN, that would hold more distances than this is
+# never computed
+INT_MAX_GRAPH_EDGES = int(
+    os.environ.get("POLAR_GRAPH_CACHE_EDGES", str(4 * 1024**2))
+)
+_CACHE_GRAPHS = LRUCache(
+    INT_MAX_GRAPH_EDGES,
+    function_sizeof=lambda tuple_graph: max(1, tuple_graph[1].nnz),
+)
+# The number of neighbors is estimated from this many random points
+_INT_EDGE_SAMPLE_SIZE = 1000
+_CACHE_EDGE_ESTIMATES = LRUCache(64)
+# Very large model sets are first aggregated into at most this many grid cells
+_INT_MAX_GRID_CELLS = int(os.environ.get("POLAR_MAX_GRID_CELLS", "20000"))
+_CACHE_GRIDS = LRUCache(8)
+
+
+def _string_hash_points(np_points):
+    return hashlib.sha256(
+        np_points.tobytes() + str(np_points.shape).encode()
+    ).hexdigest()
+
+
+def float_estimate_edges(np_points, float_radius):
+    # The number of neighbor pairs within float_radius, counting every point
+    # as its own neighbor. Only the neighbors of a random sample of the points
+    # are counted, and never stored
+    np_points = np.ascontiguousarray(np_points, dtype=float)
+    tuple_key = (_string_hash_points(np_points), float(float_radius))
+    float_edges = _CACHE_EDGE_ESTIMATES.get(tuple_key)
+    if float_edges is None:
+        int_n_points = np_points.shape[0]
+        np_sample = np_points[
+            np.random.default_rng(0).choice(
+                int_n_points,
+                min(_INT_EDGE_SAMPLE_SIZE, int_n_points),
+                replace=False,
+            )
+        ]
+        np_counts = KDTree(np_points).query_radius(
+            np_sample, float_radius, count_only=True
+        )
+        float_edges = float(np_counts.mean()) * int_n_points
+        _CACHE_EDGE_ESTIMATES.set(tuple_key, float_edges)
+
+    return float_edges
+
+
+def bool_graph_fits(np_points, float_radius):
+    return float_estimate_edges(np_points, float_radius) <= INT_MAX_GRAPH_EDGES
+
+
+def _tuple_radius_graph(np_points, float_max_eps):
+    # The graph holds the distances of all neighbors within the largest
+    # epsilon offered by the dashboard. It is computed once per set of points,
+    # every smaller epsilon only thresholds it
+    tuple_key = (_string_hash_points(np_points), float(float_max_eps))
+
+    tuple_graph = _CACHE_GRAPHS.get(tuple_key)
+    if tuple_graph is None:
+        nearest_neighbors = NearestNeighbors(
+            radius=float_max_eps, n_jobs=-1
+        ).fit(np_points)
+        tuple_graph = (
+            nearest_neighbors,
+            nearest_neighbors.radius_neighbors_graph(mode="distance"),
+        )
+        _CACHE_GRAPHS.set(tuple_key, tuple_graph)
+
+    return tuple_graph
+
+
+def np_dbscan_labels(
+    np_points,
+    float_eps,
+    int_min_pts,
+    float_max_eps,
+    np_weights=None,
+    bool_graph=True,
+):
+    # With bool_graph this gives the same labels as DBSCAN(eps, min_samples)
+    # for every epsilon up to float_max_eps from one neighbor graph, so the
+    # neighbors are only searched on the first call. Without it, or when the
+    # graph would not fit into its cache, DBSCAN searches them itself.
+    # Weighted points count as that many points, like sample_weight of DBSCAN
+    np_points = np.ascontiguousarray(np_points, dtype=float)
+    if not bool_graph or not bool_graph_fits(np_points, float_max_eps):
+        return (
+            DBSCAN(eps=float_eps, min_samples=int_min_pts)
+            .fit(np_points, sample_weight=np_weights)
+            .labels_
+        )
+
+    int_n_points = np_points.shape[0]
+    nearest_neighbors, csr_graph = _tuple_radius_graph(
+        np_points, float_max_eps
+    )
+
+    # Brute force is only chosen for a handful of points. Its distances are
+    # computed differently, so there we simply search again
+    if nearest_neighbors._fit_method == "brute":
+        csr_graph = nearest_neighbors.radius_neighbors_graph(
+            radius=float_eps, mode="connectivity"
+        )
+        np_keep = np.ones(csr_graph.nnz, dtype=bool)
+    else:
+        np_keep = csr_graph.data <= float_eps
+    np_rows = np.repeat(np.arange(int_n_points), np.diff(csr_graph.indptr))
+    np_rows = np_rows[np_keep]
+    np_cols = csr_graph.indices[np_keep]
+
+    # Every point is also its own neighbor
+    if np_weights is None:
+        np_weights = np.ones(int_n_points)
+    np_core = (
+        np.bincount(
+            np_rows, weights=np_weights[np_cols], minlength=int_n_points
+        )
+        + np_weights
+        >= int_min_pts
+    )
+
+    # Clusters are the connected components of core points
+    np_core_edges = np_core[np_rows] & np_core[np_cols]
+    _, np_components = connected_components(
+        csr_matrix(
+            (
+                np.ones(np.count_nonzero(np_core_edges), dtype=bool),
+                (np_rows[np_core_edges], np_cols[np_core_edges]),
+            ),
+            shape=(int_n_points, int_n_points),
+        ),
+        directed=False,
+    )
+
+    # DBSCAN numbers the clusters in the order of their first core point
+    np_labels = np.full(int_n_points, -1)
+    np_core_components = np_components[np_core]
+    np_unique, np_first = np.unique(np_core_components, return_index=True)
+    np_cluster_ids = np.empty(np_components.max() + 1, dtype=int)
+    np_cluster_ids[np_unique[np.argsort(np_first)]] = np.arange(
+        np_unique.shape[0]
+    )
+    np_labels[np_core] = np_cluster_ids[np_core_components]
+
+    # A border point joins the first cluster that reaches it, which is the
+    # cluster with the lowest number among its core neighbors
+    np_border_edges = ~np_core[np_rows] & np_core[np_cols]
+    np_border_labels = np.full(int_n_points, int_n_points)
+    np.minimum.at(
+        np_border_labels,
+        np_rows[np_border_edges],
+        np_labels[np_cols[np_border_edges]],
+    )
+    np_is_border = np_border_labels < int_n_points
+    np_labels[np_is_border] = np_border_labels[np_is_border]
+
+    return np_labels
+
+
+def _tuple_grid_cells(np_points, float_max_eps):
+    # Points are aggregated into cells whose diagonal is half of the largest
+    # epsilon, so all points of one cell are neighbors for the automatically
+    # found epsilon. Too many cells make the grid coarser, which bounds the
+    # memory and time of the clustering for any number of points
+    tuple_key = (_string_hash_points(np_points), float(float_max_eps))
+    tuple_grid = _CACHE_GRIDS.get(tuple_key)
+    if tuple_grid is not None:
+        return tuple_grid
+
+    _, int_n_dims = np_points.shape
+    float_cell_size = float_max_eps / (2 * np.sqrt(int_n_dims))
+    np_min = np_points.min(axis=0)
+    while True:
+        np_grid = np.floor((np_points - np_min) / float_cell_size).astype(
+            np.int64
+        )
+        np_shape = np_grid.max(axis=0) + 1
+        # Cells are numbered with one integer, as long as the grid is small
+        # enough for that, which is much faster to count than rows
+        if np.prod(np_shape.astype(float)) < 2**62:
+            _, np_cells, np_counts = np.unique(
+                np.ravel_multi_index(np_grid.T, np_shape),
+                return_inverse=True,
+                return_counts=True,
+            )
+            if np_counts.shape[0] <= _INT_MAX_GRID_CELLS:
+                break
+        float_cell_size *= 2
+
+    # Every cell is represented by the mean of its points
+    np_centroids = np.column_stack(
+        [
+            np.bincount(np_cells, weights=np_points[:, int_j]) / np_counts
+            for int_j in range(int_n_dims)
+        ]
+    )
+    tuple_grid = (np_centroids, np_cells, np_counts.astype(float))
+    _CACHE_GRIDS.set(tuple_key, tuple_grid)
+
+    return tuple_grid
+
+
+def np_grid_dbscan_labels(
+    np_points, float_eps, int_min_pts, float_max_eps, bool_graph=True
+):
+    # Weighted DBSCAN on the grid cells, whose labels are then passed on to
+    # the points of every cell. This approximates DBSCAN for model sets that
+    # are too large for an exact neighbor graph
+    np_points = np.ascontiguousarray(np_points, dtype=float)
+    np_centroids, np_cells, np_counts = _tuple_grid_cells(
+        np_points, float_max_eps
+    )
+
+    return np_dbscan_labels(
+        np_centroids,
+        float_eps,
+        int_min_pts,
+        float_max_eps,
+        np_weights=np_counts,
+        bool_graph=bool_graph,
+    )[np_cells]
+
+
+def tuple_grid_accuracy(
+    np_points, float_eps, int_min_pts, float_max_eps, int_sample_size
+):
+    # The adjusted Rand index between exact DBSCAN and the grid clustering of
+    # the same random sample of points, where 1 means identical clusters.
+    # The sample keeps the cost of the comparison fixed. A sample keeps a
+    # share of the neighbors of every point, so its neighbor pairs shrink
+    # with the square of its size, which is kept within the edge budget
+    np_points = np.ascontiguousarray(np_points, dtype=float)
+    int_n_points = np_points.shape[0]
+    float_edges = float_estimate_edges(np_points, float_eps)
+    int_sample_size = min(
+        int_sample_size,
+        int_n_points,
+        max(
+            100,
+            int(int_n_points * np.sqrt(INT_MAX_GRAPH_EDGES / float_edges)),
+        ),
+    )
+    np_sample = np_points[
+        np.random.default_rng(0).choice(
+            int_n_points, int_sample_size, replace=False
+        )
+    ]
+    np_exact_labels = (
+        DBSCAN(eps=float_eps, min_samples=int_min_pts).fit(np_sample).labels_
+    )
+    np_grid_labels = np_grid_dbscan_labels(
+        np_sample, float_eps, int_min_pts, float_max_eps
+    )
+
+    return (
+        float(adjusted_rand_score(np_exact_labels, np_grid_labels)),
+        np_sample.shape[0],
+    )
+
+
+def tuple_cluster_index(np_labels):
+    # Clusters are numbered in the order of their first point, the same way a
+    # groupby without sorting numbers them. The points of cluster i are
+    # np_members[np_offsets[i]:np_offsets[i + 1]], in their original order
+    np_unique, np_first, np_inverse = np.unique(
+        np_labels, return_index=True, return_inverse=True
+    )
+    np_rank = np.empty(np_unique.shape[0], dtype=int)
+    np_rank[np.argsort(np_first)] = np.arange(np_unique.shape[0])
+    np_clusters = np_rank[np_inverse.reshape(-1)]
+
+    np_offsets = np.zeros(np_unique.shape[0] + 1, dtype=int)
+    np.cumsum(
+        np.bincount(np_clusters, minlength=np_unique.shape[0]),
+        out=np_offsets[1:],
+    )
+    np_members = np.argsort(np_clusters, kind="stable")
+
+    return np_clusters, np_offsets, np_members
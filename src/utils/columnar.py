@@ -0,0 +1,104 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Bump this value whenever the layout of the columnar directories changes
+_INT_COLUMNAR_FORMAT_VERSION = 1
+_STRING_COLUMNAR_SUFFIX = ".columnar"
+_STRING_MANIFEST_NAME = "manifest.json"
+
+
+def path_columnar_dir(path_csv):
+    return os.path.splitext(path_csv)[0] + _STRING_COLUMNAR_SUFFIX
+
+
+def _dict_source_stamp(path_csv):
+    # Size and modification time are enough to notice that a CSV file was
+    # replaced after it was converted
+    stat_csv = os.stat(path_csv)
+
+    return {"size": stat_csv.st_size, "mtime_ns": stat_csv.st_mtime_ns}
+
+
+def bool_convert_csv(path_csv):
+    df_input = pd.read_csv(path_csv)
+
+    # Only numeric columns can be stored as plain arrays and memory-mapped
+    if not all(
+        pd.api.types.is_numeric_dtype(dtype_one)
+        for dtype_one in df_input.dtypes
+    ):
+        return False
+
+    path_output = path_columnar_dir(path_csv)
+    os.makedirs(path_output, exist_ok=True)
+
+    # Every model column is stored in its own .npy file. Files are named after
+    # the column position, since model names can contain any character
+    for int_i, string_column in enumerate(df_input.columns):
+        np.save(
+            os.path.join(path_output, str(int_i) + ".npy"),
+            np.ascontiguousarray(df_input[string_column].to_numpy()),
+            allow_pickle=False,
+        )
+
+    dict_manifest = {
+        "format": _INT_COLUMNAR_FORMAT_VERSION,
+        "columns": df_input.columns.to_list(),
+        "rows": df_input.shape[0],
+        "source": _dict_source_stamp(path_csv),
+    }
+    # The manifest is written last, so a half converted directory is never
+    # considered valid
+    with open(
+        os.path.join(path_output, _STRING_MANIFEST_NAME), "w", encoding="utf-8"
+    ) as file_output:
+        json.dump(dict_manifest, file_output)
+
+    return True
+
+
+def _dict_read_manifest(path_csv):
+    path_manifest = os.path.join(
+        path_columnar_dir(path_csv), _STRING_MANIFEST_NAME
+    )
+    try:
+        with open(path_manifest, encoding="utf-8") as file_input:
+            dict_manifest = json.load(file_input)
+    except (OSError, ValueError):
+        return None
+
+    if dict_manifest.get("format") != _INT_COLUMNAR_FORMAT_VERSION:
+        return None
+    if os.path.isfile(path_csv) and (
+        dict_manifest["source"] != _dict_source_stamp(path_csv)
+    ):
+        return None
+
+    return dict_manifest
+
+
+def df_read_dataset(path_csv):
+    # Case studies converted with convert_data.py are memory-mapped, so the
+    # values are not parsed again and all workers share the same page cache
+    # buffers. Missing or stale conversions fall back to the CSV file
+    dict_manifest = _dict_read_manifest(path_csv)
+    if dict_manifest is None:
+        return pd.read_csv(path_csv)
+
+    path_input = path_columnar_dir(path_csv)
+    dict_columns = {
+        string_column: np.load(
+            os.path.join(path_input, str(int_i) + ".npy"),
+            mmap_mode="r",
+            allow_pickle=False,
+        )
+        for int_i, string_column in enumerate(dict_manifest["columns"])
+    }
+
+    # copy=False keeps one block per column that points at the mapped file
+    return pd.DataFrame(
+        dict_columns, columns=dict_manifest["columns"], copy=False
+    )
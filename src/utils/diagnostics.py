@@ -0,0 +1,74 @@
+import contextlib
+import contextvars
+import threading
+import warnings
+
+# Warnings are only captured while at least one request runs inside
+# collect(), and the global filters and warnings.showwarning are restored
+# when the last of them leaves. warnings.catch_warnings swaps process-wide
+# state, so requests that run at the same time on threaded workers share one
+# catch_warnings block, and its hook hands every warning to the collector of
+# the context the warning was raised in
+_CONTEXT_COLLECTOR = contextvars.ContextVar("list_collector", default=None)
+_LOCK_COLLECTORS = threading.Lock()
+_DICT_ACTIVE = {"int_collectors": 0, "catch_warnings": None}
+
+
+def _show_warning_function(function_show_warning):
+    def _show_warning(
+        message, category, filename, lineno, file=None, line=None
+    ):
+        list_collector = _CONTEXT_COLLECTOR.get()
+        if list_collector is None:
+            function_show_warning(
+                message, category, filename, lineno, file, line
+            )
+            return
+        list_collector.append(
+            warnings.WarningMessage(
+                message, category, filename, lineno, file, line
+            )
+        )
+
+    return _show_warning
+
+
+@contextlib.contextmanager
+def collect():
+    # Every warning raised in this context, and only in this context, is
+    # appended to the yielded list, every time it is raised. Warnings that
+    # nobody reads are dropped
+    list_collected = []
+    token_collector = _CONTEXT_COLLECTOR.set(list_collected)
+    with _LOCK_COLLECTORS:
+        if _DICT_ACTIVE["int_collectors"] == 0:
+            catch_warnings = warnings.catch_warnings()
+            catch_warnings.__enter__()
+            warnings.simplefilter("always")
+            warnings.showwarning = _show_warning_function(warnings.showwarning)
+            _DICT_ACTIVE["catch_warnings"] = catch_warnings
+        _DICT_ACTIVE["int_collectors"] += 1
+    try:
+        yield list_collected
+    finally:
+        _CONTEXT_COLLECTOR.reset(token_collector)
+        with _LOCK_COLLECTORS:
+            _DICT_ACTIVE["int_collectors"] -= 1
+            if _DICT_ACTIVE["int_collectors"] == 0:
+                _DICT_ACTIVE["catch_warnings"].__exit__(None, None, None)
+                _DICT_ACTIVE["catch_warnings"] = None
+
+
+def list_runtime_messages(list_collected):
+    # The dashboard shows every distinct runtime warning once, in the order
+    # in which they were raised. The polar_diagrams library breaks its
+    # messages into lines, which are joined again
+    list_messages = []
+    for warning_message in list_collected:
+        if not issubclass(warning_message.category, RuntimeWarning):
+            continue
+        string_message = str(warning_message.message).replace("\n", " ")
+        if string_message not in list_messages:
+            list_messages.append(string_message)
+
+    return list_messages
@@ -0,0 +1,157 @@
+import numpy as np
+import polar_diagrams.polar_diagrams as polar_diagrams_internal
+
+_DICT_SORTING_MEASURES = {
+    "taylor": "CRMSE",
+    "scaled": "VI",
+    "normalized": "RVI",
+}
+# The radial, angular and tooltip columns of every diagram type, in the order
+# of the customdata of its traces
+_DICT_DIAGRAM_COLUMNS = {
+    "taylor": ("Standard Deviation", "Angle", "Correlation", "CRMSE"),
+    "scaled": ("Entropy", "Angle_SMI", "Scaled MI", "VI"),
+    "normalized": ("Root Entropy", "Angle_NMI", "Normalized MI", "RVI"),
+}
+# More models than this already use the larger color palette
+_INT_PALETTE_MODELS = 10
+
+
+def _dict_create_template_diagram(
+    df_sorted, string_reference_model, string_diagram_type, string_mid_type
+):
+    # polar_diagrams gives every model a trace whose customdata repeats its
+    # tooltip row once per model, which is quadratic in the number of models.
+    # Here the library only draws a few models, which give the layout and a
+    # template trace, and every model gets a copy of that template with its
+    # own values. Only the first customdata row is ever shown
+    string_radial, string_angular, string_label_2, string_label_3 = (
+        _DICT_DIAGRAM_COLUMNS[string_mid_type or string_diagram_type]
+    )
+    np_reference = np.flatnonzero(
+        df_sorted["Model"].to_numpy() == string_reference_model
+    )
+
+    # The few models keep the color palette of all models, the largest angle,
+    # which decides if the diagram spans one or two quadrants, and the
+    # reference model
+    list_rows = sorted(
+        set(range(min(_INT_PALETTE_MODELS + 1, df_sorted.shape[0])))
+        | {int(df_sorted[string_angular].to_numpy().argmax())}
+        | set(np_reference.tolist())
+    )
+    dict_result = polar_diagrams_internal._chart_create_diagram(
+        [df_sorted.iloc[list_rows].reset_index(drop=True)],
+        string_reference_model=string_reference_model,
+        string_mid_type=string_mid_type,
+        bool_flag_as_subplot=False,
+        string_diagram_type=string_diagram_type,
+        bool_normalized_measures=False,
+    ).to_plotly_json()
+
+    # The radial range and the height depend on all models
+    float_std = df_sorted[string_radial].std()
+    float_max = df_sorted[string_radial].max()
+    dict_result["layout"]["polar"]["radialaxis"]["range"] = [
+        0,
+        float_max * 1.5 if float_std <= 0.1 else float_max + float_std,
+    ]
+    dict_result["layout"]["height"] = (
+        polar_diagrams_internal._INT_CHART_HEIGHT
+        + 80 * round(df_sorted.shape[0] / 4)
+    )
+
+    dict_template = dict_result["data"][0]
+    dict_colors = polar_diagrams_internal._dict_calculate_model_colors(
+        df_sorted["Model"].to_list(), string_reference_model, 1
+    )
+    list_traces = []
+    for int_i, tuple_row in enumerate(
+        df_sorted[
+            [
+                "Model",
+                string_radial,
+                string_label_2,
+                string_label_3,
+                string_angular,
+            ]
+        ].itertuples(index=False, name=None)
+    ):
+        tuple_color = dict_colors[tuple_row[0]][0]
+        string_line_color = "rgba" + str(tuple_color + (1,))
+        # Only the dictionaries that get values of their own are copied
+        dict_trace = dict(dict_template)
+        dict_trace["hoverlabel"] = dict(dict_template["hoverlabel"])
+        dict_trace["marker"] = dict(dict_template["marker"])
+        dict_trace["marker"]["line"] = dict(dict_template["marker"]["line"])
+        dict_trace.update(
+            name=str(int_i) + ". " + tuple_row[0],
+            r=[tuple_row[1]],
+            theta=[tuple_row[4]],
+            legendgroup=tuple_row[0],
+            customdata=[list(tuple_row[:4])],
+        )
+        dict_trace["hoverlabel"]["bordercolor"] = string_line_color
+        dict_trace["marker"]["line"]["color"] = string_line_color
+        dict_trace["marker"]["color"] = "rgba" + str(
+            tuple_color + (polar_diagrams_internal._FLOAT_MARKER_OPACITY,)
+        )
+        list_traces.append(dict_trace)
+    dict_result["data"] = list_traces
+
+    return dict_result
+
+
+def chart_create_diagram(
+    list_df_measures,
+    string_reference_model,
+    string_diagram_type,
+    string_mid_type=None,
+    bool_template=False,
+):
+    # This follows polar_diagrams.chart_create_taylor_diagram and
+    # polar_diagrams.chart_create_mi_diagram step by step, but it starts from
+    # already calculated property tables instead of the raw model predictions.
+    # That way the expensive measures are estimated only once per render
+    if string_diagram_type == "taylor":
+        string_mid_type = None
+
+    for df_measures in list_df_measures:
+        # The second table can hold scalar values that are encoded using the
+        # marker size. Those are not checked for overlapping marks
+        if "Scalar" in df_measures.columns:
+            continue
+        polar_diagrams_internal._warning_check_identical_model_values(
+            df_measures,
+            string_diagram_type,
+            string_mid_type if string_mid_type else "scaled",
+        )
+
+    list_df_sorted = polar_diagrams_internal._df_sort_models_by_measure(
+        list(list_df_measures),
+        string_reference_model,
+        string_measure=_DICT_SORTING_MEASURES[
+            string_mid_type if string_mid_type else string_diagram_type
+        ],
+    )
+
+    # Diagrams of one table with many models are built from a template trace,
+    # which gives the same figure as a plain dictionary
+    if bool_template and len(list_df_sorted) == 1:
+        return _dict_create_template_diagram(
+            list_df_sorted[0],
+            string_reference_model,
+            string_diagram_type,
+            string_mid_type,
+        )
+
+    chart_result = polar_diagrams_internal._chart_create_diagram(
+        list_df_sorted,
+        string_reference_model=string_reference_model,
+        string_mid_type=string_mid_type,
+        bool_flag_as_subplot=False,
+        string_diagram_type=string_diagram_type,
+        bool_normalized_measures=False,
+    )
+
+    return chart_result
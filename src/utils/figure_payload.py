@@ -0,0 +1,160 @@
+import base64
+import gzip
+import os
+import re
+import warnings
+
+import dash
+import numpy as np
+import plotly.io as pio
+
+# Figures are sent to the browser as JSON with full float64 precision. Both
+# reductions below are opt-in. POLAR_PAYLOAD_DIGITS rounds every number of
+# the traces to that many significant digits, and POLAR_PAYLOAD_TYPED_ARRAYS
+# sends long coordinate arrays as base64 typed arrays instead of JSON numbers
+_INT_SIGNIFICANT_DIGITS = int(os.environ.get("POLAR_PAYLOAD_DIGITS", "0"))
+_BOOL_TYPED_ARRAYS = os.environ.get("POLAR_PAYLOAD_TYPED_ARRAYS", "0") == "1"
+# Shorter arrays are smaller as JSON than as base64 with its dtype
+_INT_MIN_TYPED_LENGTH = 16
+_TUPLE_TYPED_KEYS = ("r", "theta", "x", "y")
+# plotly.js decodes typed arrays from version 2.28 on
+_TUPLE_MIN_PLOTLYJS_VERSION = (2, 28)
+_RE_PLOTLYJS_VERSION = re.compile(rb"plotly\.js v(\d+)\.(\d+)")
+
+
+def _tuple_plotlyjs_version():
+    # dcc.Graph renders with the plotly.js bundled in Dash, whose version is
+    # written at the top of that file
+    try:
+        with open(
+            os.path.join(os.path.dirname(dash.dcc.__file__), "plotly.min.js"),
+            "rb",
+        ) as file_input:
+            re_match = _RE_PLOTLYJS_VERSION.search(file_input.read(256))
+    except OSError:
+        return (0, 0)
+    if re_match is None:
+        return (0, 0)
+
+    return (int(re_match.group(1)), int(re_match.group(2)))
+
+
+if _BOOL_TYPED_ARRAYS and (
+    _tuple_plotlyjs_version() < _TUPLE_MIN_PLOTLYJS_VERSION
+):
+    warnings.warn(
+        "POLAR_PAYLOAD_TYPED_ARRAYS needs plotly.js "
+        + ".".join(str(i) for i in _TUPLE_MIN_PLOTLYJS_VERSION)
+        + " or newer, but Dash bundles plotly.js "
+        + ".".join(str(i) for i in _tuple_plotlyjs_version())
+        + ", so numeric arrays are sent as JSON.",
+        RuntimeWarning,
+        stacklevel=1,
+    )
+    _BOOL_TYPED_ARRAYS = False
+
+
+def _np_round_significant(np_values, int_digits):
+    # We multiply or divide by an exact power of ten, so the rounded values
+    # are the doubles closest to the short decimals and serialize as such
+    np_result = np_values.copy()
+    np_rounded = np.flatnonzero(np.isfinite(np_values) & (np_values != 0))
+    np_exponent = (
+        int_digits
+        - 1
+        - np.floor(np.log10(np.abs(np_values[np_rounded]))).astype(int)
+    )
+
+    # Values so close to zero that the power of ten overflows stay as they are
+    np_is_small = (np_exponent >= 0) & (np_exponent <= 300)
+    np_small = np_rounded[np_is_small]
+    np_scale = 10.0 ** np_exponent[np_is_small]
+    np_result[np_small] = np.round(np_values[np_small] * np_scale) / np_scale
+    np_large = np_rounded[np_exponent < 0]
+    np_scale = 10.0 ** -np_exponent[np_exponent < 0]
+    np_result[np_large] = np.round(np_values[np_large] / np_scale) * np_scale
+
+    return np_result
+
+
+def _value_encode(value_input, bool_typed_array):
+    if isinstance(value_input, dict):
+        return {
+            string_key: _value_encode(value_one, False)
+            for string_key, value_one in value_input.items()
+        }
+    if isinstance(value_input, float):
+        if _INT_SIGNIFICANT_DIGITS <= 0:
+            return value_input
+        return float(
+            _np_round_significant(
+                np.array([value_input]), _INT_SIGNIFICANT_DIGITS
+            )[0]
+        )
+    if not isinstance(value_input, (list, tuple, np.ndarray)):
+        return value_input
+
+    # Lists mixing numbers with strings or lists, such as customdata, are
+    # encoded element by element
+    try:
+        np_values = np.asarray(value_input)
+    except ValueError:
+        np_values = np.asarray(value_input, dtype=object)
+    if np_values.ndim != 1 or np_values.dtype.kind not in "iuf":
+        return [_value_encode(value_one, False) for value_one in value_input]
+
+    if np_values.dtype.kind == "f" and _INT_SIGNIFICANT_DIGITS > 0:
+        np_values = _np_round_significant(
+            np_values.astype(float), _INT_SIGNIFICANT_DIGITS
+        )
+    if (
+        bool_typed_array
+        and _BOOL_TYPED_ARRAYS
+        and np_values.shape[0] >= _INT_MIN_TYPED_LENGTH
+    ):
+        string_dtype = "f8" if np_values.dtype.kind == "f" else "i4"
+        if string_dtype == "i4" and (
+            np_values.min() < np.iinfo(np.int32).min
+            or np_values.max() > np.iinfo(np.int32).max
+        ):
+            string_dtype = "f8"
+        return {
+            "dtype": string_dtype,
+            "bdata": base64.b64encode(
+                np_values.astype("<" + string_dtype).tobytes()
+            ).decode("ascii"),
+        }
+
+    return np_values.tolist()
+
+
+def dict_encode_figure(dict_figure, bool_typed_arrays=True):
+    # Only the traces are encoded, into a new figure, so cached figures stay
+    # as they are. Figures whose arrays are read by the clientside callbacks
+    # have to be encoded without typed arrays
+    if _INT_SIGNIFICANT_DIGITS <= 0 and not _BOOL_TYPED_ARRAYS:
+        return dict_figure
+    if not dict_figure or "data" not in dict_figure:
+        return dict_figure
+
+    return dict(
+        dict_figure,
+        data=[
+            {
+                string_key: _value_encode(
+                    value_one,
+                    bool_typed_arrays and string_key in _TUPLE_TYPED_KEYS,
+                )
+                for string_key, value_one in dict_trace.items()
+            }
+            for dict_trace in dict_figure["data"]
+        ],
+    )
+
+
+def tuple_figure_bytes(dict_figure):
+    # The size of the figure as Dash serializes it, and after gzip, which is
+    # roughly what a compressed response costs on the wire
+    bytes_json = pio.to_json(dict_figure, validate=False).encode()
+
+    return len(bytes_json), len(gzip.compress(bytes_json, compresslevel=6))
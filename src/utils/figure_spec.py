@@ -0,0 +1,64 @@
+import os
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Figures are assembled as plain dictionaries that plotly.js reads as they
+# are. Plotly validates every property of every trace whenever a figure is
+# built or updated, so we only do that once at the end, and only when
+# POLAR_VALIDATE_FIGURES is set while developing
+_BOOL_VALIDATE_FIGURES = os.environ.get("POLAR_VALIDATE_FIGURES", "0") == "1"
+_DICT_TEMPLATES = {}
+
+
+def dict_figure(chart_input):
+    # Figures built by the polar_diagrams library are converted only once,
+    # figures from the artifact bundle are already plain dictionaries
+    if isinstance(chart_input, dict):
+        return chart_input
+
+    return chart_input.to_plotly_json()
+
+
+def dict_template(string_template):
+    # Named templates are resolved by plotly.py, not by plotly.js, so we put
+    # the template itself into the layout the same way update_layout does
+    if string_template not in _DICT_TEMPLATES:
+        _DICT_TEMPLATES[string_template] = pio.templates[
+            string_template
+        ].to_plotly_json()
+
+    return _DICT_TEMPLATES[string_template]
+
+
+def dict_update(dict_target, dict_values):
+    # Nested dictionaries are merged and None removes a property, like
+    # update_layout does. Every other value, including lists, is replaced
+    for string_key, value in dict_values.items():
+        if value is None:
+            dict_target.pop(string_key, None)
+        elif isinstance(value, dict):
+            if not isinstance(dict_target.get(string_key), dict):
+                dict_target[string_key] = {}
+            dict_update(dict_target[string_key], value)
+        else:
+            dict_target[string_key] = value
+
+    return dict_target
+
+
+def dict_update_axes(dict_figure_input, string_axis, dict_values):
+    # The same as update_xaxes and update_yaxes for every subplot
+    for string_key in dict_figure_input["layout"]:
+        if string_key.startswith(string_axis):
+            dict_update(dict_figure_input["layout"][string_key], dict_values)
+
+    return dict_figure_input
+
+
+def dict_validated(dict_figure_input):
+    # Building a plotly figure raises a ValueError for every invalid property
+    if _BOOL_VALIDATE_FIGURES:
+        go.Figure(dict_figure_input)
+
+    return dict_figure_input
@@ -0,0 +1,63 @@
+import os
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    # A thread-safe LRU cache bounded by the summed size of its values. The
+    # size of one value is measured with function_sizeof, which defaults to 1
+    # so that the bound becomes the maximum number of entries
+    def __init__(self, int_max_size, function_sizeof=None):
+        self._int_max_size = int_max_size
+        self._function_sizeof = function_sizeof or (lambda value: 1)
+        self._dict_entries = OrderedDict()
+        self._int_current_size = 0
+        self._lock = threading.Lock()
+        # A thread of the parent can hold the lock at the moment a background
+        # job is forked, and would never release it in the child
+        os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._dict_entries:
+                return default
+            self._dict_entries.move_to_end(key)
+            return self._dict_entries[key][0]
+
+    def set(self, key, value):
+        int_size = self._function_sizeof(value)
+        with self._lock:
+            if key in self._dict_entries:
+                self._int_current_size -= self._dict_entries.pop(key)[1]
+
+            # Values larger than the whole cache are never stored
+            if int_size > self._int_max_size:
+                return
+
+            self._dict_entries[key] = (value, int_size)
+            self._int_current_size += int_size
+            while self._int_current_size > self._int_max_size:
+                _, (_, int_evicted_size) = self._dict_entries.popitem(
+                    last=False
+                )
+                self._int_current_size -= int_evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._dict_entries.clear()
+            self._int_current_size = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._dict_entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._dict_entries)
+
+    @property
+    def int_current_size(self):
+        return self._int_current_size
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+def dict_create_model_arrays(dict_view_state):
+    # Every model of the detail diagram is one trace with a single point, so
+    # the selection works on one array entry per trace
+    return {
+        "r": np.asarray(dict_view_state["list_model_r"], dtype=float),
+        "theta": np.asarray(dict_view_state["list_model_theta"], dtype=float),
+        "distance": np.asarray(
+            dict_view_state["list_model_distance"], dtype=float
+        ),
+    }
+
+
+def np_mask_models(
+    dict_model_arrays,
+    list_radial_range=None,
+    list_angular_range=None,
+    list_selected_points=None,
+    list_trace_models=None,
+    list_expanded_traces=None,
+):
+    # All conditions are combined in one pass. A missing condition selects
+    # every model, so a double-click without any range shows all of them
+    np_mask = np.ones(dict_model_arrays["r"].shape[0], dtype=bool)
+
+    if list_radial_range is not None:
+        float_min_r, float_max_r = sorted(list_radial_range)
+        np_mask &= (dict_model_arrays["r"] >= float_min_r) & (
+            dict_model_arrays["r"] <= float_max_r
+        )
+
+    # Angles are in degrees, the same way they are drawn in the diagram
+    if list_angular_range is not None:
+        float_min_theta, float_max_theta = sorted(list_angular_range)
+        np_mask &= (dict_model_arrays["theta"] >= float_min_theta) & (
+            dict_model_arrays["theta"] <= float_max_theta
+        )
+
+    # Box and lasso selections report the trace and the point index of every
+    # selected point. Packed traces hold many models, which list_trace_models
+    # maps back to the model indices. A collapsed packed trace only shows the
+    # representative of its cluster, which stands for all of its models
+    if list_selected_points is not None:
+        list_selected_models = []
+        for dict_point in list_selected_points:
+            if "curveNumber" not in dict_point:
+                continue
+            int_curve = dict_point["curveNumber"]
+            if list_trace_models is None:
+                list_selected_models.append(int_curve)
+            elif (
+                list_expanded_traces is None or list_expanded_traces[int_curve]
+            ):
+                list_selected_models.append(
+                    list_trace_models[int_curve][dict_point["pointNumber"]]
+                )
+            else:
+                list_selected_models += list_trace_models[int_curve]
+        np_mask &= np.isin(
+            np.arange(np_mask.shape[0]),
+            np.asarray(list_selected_models, dtype=int),
+        )
+
+    return np_mask
+
+
+def np_changed_indices(list_old_visible, np_new_visible):
+    # Only traces whose visibility changed have to be sent to the browser
+    np_old_visible = np.asarray(list_old_visible, dtype=bool)
+    if np_old_visible.shape != np_new_visible.shape:
+        return np.arange(np_new_visible.shape[0])
+
+    return np.flatnonzero(np_old_visible != np_new_visible)
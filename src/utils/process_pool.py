@@ -0,0 +1,74 @@
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+# Every web worker starts its own pool on first use, so the processes of one
+# instance are the web workers times POLAR_POOL_PROCESSES. With 1 or less the
+# tasks run one after another inside the calling thread
+_INT_POOL_PROCESSES = int(
+    os.environ.get("POLAR_POOL_PROCESSES", str(min(6, os.cpu_count() or 1)))
+)
+_POOL_EXECUTOR = None
+_LOCK_POOL = threading.Lock()
+
+
+def _executor_get(string_module):
+    # Forking a web worker that already runs threads can copy held locks into
+    # the child, so the processes are forked from a clean server process
+    # instead. That server imports the module of the tasks once, so every
+    # process starts with it already imported
+    global _POOL_EXECUTOR
+    with _LOCK_POOL:
+        if _POOL_EXECUTOR is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload([string_module])
+            else:
+                context = multiprocessing.get_context("spawn")
+            _POOL_EXECUTOR = concurrent.futures.ProcessPoolExecutor(
+                max_workers=_INT_POOL_PROCESSES, mp_context=context
+            )
+
+        return _POOL_EXECUTOR
+
+
+def _reset_executor(executor_broken):
+    global _POOL_EXECUTOR
+    with _LOCK_POOL:
+        if _POOL_EXECUTOR is executor_broken:
+            _POOL_EXECUTOR = None
+    executor_broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _forget_executor():
+    # A forked process, such as a background job, inherits the pool object
+    # but none of its threads and processes, so it starts a pool of its own
+    global _POOL_EXECUTOR, _LOCK_POOL
+    _POOL_EXECUTOR = None
+    _LOCK_POOL = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_executor)
+
+
+def list_map(function_task, list_arguments):
+    # The results come in the order of list_arguments. function_task has to
+    # be a module-level function, and its arguments and results are pickled
+    if _INT_POOL_PROCESSES <= 1 or len(list_arguments) <= 1:
+        return [function_task(*tuple_args) for tuple_args in list_arguments]
+
+    executor = _executor_get(function_task.__module__)
+    try:
+        list_futures = [
+            executor.submit(function_task, *tuple_args)
+            for tuple_args in list_arguments
+        ]
+        return [future.result() for future in list_futures]
+    except BrokenProcessPool:
+        # A process that died, for example killed for its memory, breaks the
+        # whole pool. The next call starts a new one and this one computes
+        # its tasks here
+        _reset_executor(executor)
+        return [function_task(*tuple_args) for tuple_args in list_arguments]
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+import polar_diagrams
+
+from utils import shared_cache
+from utils.lru_cache import LRUCache
+
+# Bump this value whenever the layout of the cached property tables changes so
+# that old entries on disk are never read again
+_INT_CACHE_FORMAT_VERSION = 1
+_PATH_CACHE_DIR = os.environ.get(
+    "POLAR_CACHE_DIR", os.path.join("..", "cache", "properties")
+)
+_INT_MEMORY_MAX_BYTES = int(
+    os.environ.get("POLAR_CACHE_MEMORY_BYTES", str(64 * 1024**2))
+)
+_INT_DISK_MAX_BYTES = int(
+    os.environ.get("POLAR_CACHE_DISK_BYTES", str(512 * 1024**2))
+)
+_CACHE_MEMORY = LRUCache(
+    _INT_MEMORY_MAX_BYTES,
+    function_sizeof=lambda df: int(df.memory_usage(deep=True).sum()),
+)
+_DICT_STATISTICS = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+_LOCK_STATISTICS = threading.Lock()
+
+
+def _increment_statistic(string_counter):
+    with _LOCK_STATISTICS:
+        _DICT_STATISTICS[string_counter] += 1
+
+
+def string_hash_dataframe(df_input):
+    # The hash covers column names, dtypes and every value of the data set, so
+    # two files with the same content share the same cache entries
+    hash_result = hashlib.sha256()
+    hash_result.update(
+        json.dumps(
+            [[str(i), str(j)] for i, j in df_input.dtypes.items()]
+        ).encode()
+    )
+    hash_result.update(
+        pd.util.hash_pandas_object(df_input, index=True).to_numpy().tobytes()
+    )
+
+    return hash_result.hexdigest()
+
+
+def string_properties_key(
+    df_input, string_reference_model, string_diagram_type, dict_mi_parameters
+):
+    dict_key = {
+        "format": _INT_CACHE_FORMAT_VERSION,
+        "polar_diagrams": polar_diagrams.__version__,
+        "data": string_hash_dataframe(df_input),
+        "reference": string_reference_model,
+        "diagram": string_diagram_type,
+        # MI parameters do not change the Taylor properties, so they are only
+        # a part of the key for the Mutual Information diagram
+        "mi_parameters": (
+            dict_mi_parameters if string_diagram_type == "mid" else None
+        ),
+    }
+
+    return hashlib.sha256(
+        json.dumps(dict_key, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def df_cached_properties(string_key):
+    # The cached property table of string_key, or None when it still has to
+    # be estimated, which counts as a miss
+    df_result = _CACHE_MEMORY.get(string_key)
+    if df_result is not None:
+        _increment_statistic("memory_hits")
+        return df_result.copy()
+
+    df_result = shared_cache.object_read_entry(_PATH_CACHE_DIR, string_key)
+    if df_result is not None:
+        _increment_statistic("disk_hits")
+        _CACHE_MEMORY.set(string_key, df_result)
+        return df_result.copy()
+
+    _increment_statistic("misses")
+
+    return None
+
+
+def df_estimate_properties(
+    df_input,
+    string_reference_model,
+    string_diagram_type,
+    dict_mi_parameters=None,
+):
+    # The estimation alone never touches the cache, so a process of the pool
+    # can run it and hand the table back to the process that caches it
+    if string_diagram_type == "taylor":
+        return polar_diagrams.df_calculate_td_properties(
+            df_input, string_reference_model
+        )
+    if dict_mi_parameters is None:
+        # Case studies without MI parameters use the library defaults
+        return polar_diagrams.df_calculate_mid_properties(
+            df_input, string_reference_model
+        )
+
+    return polar_diagrams.df_calculate_mid_properties(
+        df_input,
+        string_reference_model,
+        dict_mi_parameters=dict_mi_parameters,
+    )
+
+
+def df_calculate_properties(
+    df_input,
+    string_reference_model,
+    string_diagram_type,
+    dict_mi_parameters=None,
+):
+    string_key = string_properties_key(
+        df_input,
+        string_reference_model,
+        string_diagram_type,
+        dict_mi_parameters,
+    )
+
+    df_result = df_cached_properties(string_key)
+    if df_result is not None:
+        return df_result
+
+    df_result = df_estimate_properties(
+        df_input,
+        string_reference_model,
+        string_diagram_type,
+        dict_mi_parameters,
+    )
+    store_properties(string_key, df_result)
+
+    return df_result.copy()
+
+
+def store_properties(string_key, df_result):
+    # Tables estimated elsewhere, by a process of the pool or ahead of time
+    # for the artifact bundle, are stored under the key they were estimated
+    # with, so they are never estimated again
+    _CACHE_MEMORY.set(string_key, df_result)
+    if not shared_cache.bool_has_entry(_PATH_CACHE_DIR, string_key):
+        shared_cache.write_entry(
+            _PATH_CACHE_DIR, string_key, df_result, _INT_DISK_MAX_BYTES
+        )
+
+
+def dict_cache_statistics():
+    with _LOCK_STATISTICS:
+        dict_result = dict(_DICT_STATISTICS)
+    dict_result["memory_entries"] = len(_CACHE_MEMORY)
+    dict_result["memory_bytes"] = _CACHE_MEMORY.int_current_size
+
+    return dict_result
+
+
+def clear_cache(bool_disk=False):
+    _CACHE_MEMORY.clear()
+    if bool_disk:
+        shared_cache.clear_entries(_PATH_CACHE_DIR)
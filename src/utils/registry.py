@@ -0,0 +1,133 @@
+import glob
+import json
+import os
+import re
+import threading
+
+from utils import columnar
+
+# The registry describes every case study offered by the dashboard. Another
+# registry file can be used by setting POLAR_CASE_STUDIES, file patterns inside
+# it are relative to the directory of the registry file
+_PATH_REGISTRY = os.environ.get(
+    "POLAR_CASE_STUDIES", os.path.join("..", "data", "case_studies.json")
+)
+_LIST_LAYOUTS = ["overview_detail", "small_multiple"]
+_DICT_REGISTRY = None
+_DICT_LOADED_CASE_STUDIES = {}
+_LOCK_REGISTRY = threading.Lock()
+_RE_NUMBER = re.compile(r"(\d+(?:\.\d+)?)")
+
+
+def path_registry():
+    return _PATH_REGISTRY
+
+
+def _dict_read_registry():
+    global _DICT_REGISTRY
+
+    # The registry is read only once per process
+    with _LOCK_REGISTRY:
+        if _DICT_REGISTRY is None:
+            with open(_PATH_REGISTRY, encoding="utf-8") as file_input:
+                dict_registry = json.load(file_input)
+
+            for dict_case_study in dict_registry["case_studies"]:
+                if dict_case_study["layout"] not in _LIST_LAYOUTS:
+                    raise ValueError(
+                        "Case study "
+                        + dict_case_study["id"]
+                        + " uses an unknown layout "
+                        + dict_case_study["layout"]
+                        + ". Use one of: "
+                        + ", ".join(_LIST_LAYOUTS)
+                    )
+                dict_case_study.setdefault("mi_parameters", None)
+                dict_case_study.setdefault("user_study", False)
+
+            _DICT_REGISTRY = dict_registry
+
+    return _DICT_REGISTRY
+
+
+def list_case_studies(string_layout=None):
+    return [
+        dict_case_study
+        for dict_case_study in _dict_read_registry()["case_studies"]
+        if string_layout is None or dict_case_study["layout"] == string_layout
+    ]
+
+
+def dict_get_case_study(string_case_study):
+    for dict_case_study in list_case_studies():
+        if dict_case_study["id"] == string_case_study:
+            return dict_case_study
+
+    return None
+
+
+def string_default_case_study():
+    return _dict_read_registry()["default"]
+
+
+def _tuple_natural_key(path_file):
+    # Splitting on numbers alternates text and numbers, so the keys of any
+    # two paths compare text with text and numbers with numbers
+    list_parts = _RE_NUMBER.split(os.path.basename(path_file))
+    list_parts[1::2] = [float(i) for i in list_parts[1::2]]
+
+    return tuple(list_parts), path_file
+
+
+def list_case_study_paths(dict_case_study):
+    path_base = os.path.dirname(_PATH_REGISTRY)
+    list_paths = []
+    for string_pattern in dict_case_study["files"]:
+        # The matches of every pattern are sorted by their numbers, so a
+        # hyperparameter sweep is always shown in the same order whatever the
+        # directory order is, and 10.0 comes after 2.0
+        list_paths += sorted(
+            glob.glob(os.path.join(path_base, string_pattern)),
+            key=_tuple_natural_key,
+        )
+
+    return list_paths
+
+
+def list_all_paths():
+    return [
+        path_file
+        for dict_case_study in list_case_studies()
+        for path_file in list_case_study_paths(dict_case_study)
+    ]
+
+
+def tuple_load_case_study(string_case_study):
+    # Every case study is loaded at most once per process. All sessions share
+    # the same data frames, which are memory-mapped when the files were
+    # converted, so they must be treated as read-only
+    with _LOCK_REGISTRY:
+        tuple_result = _DICT_LOADED_CASE_STUDIES.get(string_case_study)
+    if tuple_result is not None:
+        return tuple_result
+
+    dict_case_study = dict_get_case_study(string_case_study)
+    if dict_case_study is None:
+        raise KeyError("Unknown case study " + string_case_study)
+
+    list_paths = list_case_study_paths(dict_case_study)
+    if not list_paths:
+        raise FileNotFoundError(
+            "No files found for case study " + string_case_study
+        )
+    tuple_result = (
+        list_paths,
+        [columnar.df_read_dataset(path_file) for path_file in list_paths],
+    )
+
+    with _LOCK_REGISTRY:
+        tuple_result = _DICT_LOADED_CASE_STUDIES.setdefault(
+            string_case_study, tuple_result
+        )
+
+    return tuple_result
@@ -0,0 +1,141 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+
+from utils.lru_cache import LRUCache
+
+# The memory backend keeps sessions inside one process, so it only suits a
+# single worker. The file backend shares sessions between all workers and
+# threads that can see POLAR_SESSION_DIR, and it is the default when gunicorn
+# is told to start more than one worker through WEB_CONCURRENCY
+_STRING_BACKEND = os.environ.get(
+    "POLAR_SESSION_BACKEND",
+    "file" if int(os.environ.get("WEB_CONCURRENCY", "1")) > 1 else "memory",
+)
+_PATH_SESSION_DIR = os.environ.get(
+    "POLAR_SESSION_DIR", os.path.join("..", "cache", "sessions")
+)
+_INT_MAX_SESSIONS = int(os.environ.get("POLAR_SESSION_MAX_ENTRIES", "4096"))
+_INT_SESSION_TTL_SECONDS = int(
+    os.environ.get("POLAR_SESSION_TTL", str(24 * 3600))
+)
+_INT_EVICTION_INTERVAL_SECONDS = 60
+_RE_SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class _MemoryBackend:
+    def __init__(self):
+        self._cache = LRUCache(_INT_MAX_SESSIONS)
+        self._lock = threading.Lock()
+
+    def get(self, string_session_id):
+        return dict(self._cache.get(string_session_id, {}))
+
+    def update(self, string_session_id, dict_values):
+        # The lock keeps concurrent updates of one session from dropping keys
+        with self._lock:
+            dict_session = dict(self._cache.get(string_session_id, {}))
+            dict_session.update(dict_values)
+            self._cache.set(string_session_id, dict_session)
+
+
+class _FileBackend:
+    def __init__(self):
+        self._float_last_eviction = 0.0
+        self._lock = threading.Lock()
+
+    def _path_session(self, string_session_id):
+        return os.path.join(_PATH_SESSION_DIR, string_session_id + ".json")
+
+    def get(self, string_session_id):
+        try:
+            with open(
+                self._path_session(string_session_id), encoding="utf-8"
+            ) as file_input:
+                return json.load(file_input)
+        except (OSError, ValueError):
+            return {}
+
+    def update(self, string_session_id, dict_values):
+        # Only one worker serves a session at a time, so the lock just has to
+        # order the callbacks of this process
+        with self._lock:
+            dict_session = self.get(string_session_id)
+            dict_session.update(dict_values)
+            try:
+                os.makedirs(_PATH_SESSION_DIR, exist_ok=True)
+                # We write to a temporary file first and then rename it, so
+                # that other workers never read a half written session
+                int_fd, path_tmp = tempfile.mkstemp(
+                    dir=_PATH_SESSION_DIR, suffix=".tmp"
+                )
+                with os.fdopen(int_fd, "w", encoding="utf-8") as file_output:
+                    json.dump(dict_session, file_output)
+                os.replace(path_tmp, self._path_session(string_session_id))
+            except OSError:
+                return
+
+        self._evict_expired_sessions()
+
+    def _evict_expired_sessions(self):
+        float_now = time.time()
+        if float_now - self._float_last_eviction < (
+            _INT_EVICTION_INTERVAL_SECONDS
+        ):
+            return
+        self._float_last_eviction = float_now
+
+        for dir_entry in os.scandir(_PATH_SESSION_DIR):
+            try:
+                if (
+                    float_now - dir_entry.stat().st_mtime
+                    > _INT_SESSION_TTL_SECONDS
+                ):
+                    os.remove(dir_entry.path)
+            except OSError:
+                continue
+
+
+if _STRING_BACKEND == "file":
+    _BACKEND = _FileBackend()
+elif _STRING_BACKEND == "memory":
+    _BACKEND = _MemoryBackend()
+else:
+    raise ValueError(
+        "POLAR_SESSION_BACKEND must be either memory or file, not "
+        + _STRING_BACKEND
+    )
+
+
+def string_backend():
+    return _STRING_BACKEND
+
+
+def string_new_session_id():
+    return uuid.uuid4().hex
+
+
+def _bool_valid_session_id(string_session_id):
+    # Session ids come from the browser, so they are checked before they are
+    # used as file names
+    return isinstance(string_session_id, str) and bool(
+        _RE_SESSION_ID.match(string_session_id)
+    )
+
+
+def dict_get_session(string_session_id):
+    if not _bool_valid_session_id(string_session_id):
+        return {}
+
+    return _BACKEND.get(string_session_id)
+
+
+def update_session(string_session_id, dict_values):
+    if not _bool_valid_session_id(string_session_id):
+        return
+
+    _BACKEND.update(string_session_id, dict_values)
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+from utils.lru_cache import LRUCache
+
+
+def object_read_entry(path_dir, string_key):
+    path_entry = os.path.join(path_dir, string_key + ".pkl")
+    try:
+        with open(path_entry, "rb") as file_entry:
+            object_result = pickle.load(file_entry)
+        # We touch the file so that the disk eviction keeps recently used
+        # entries around
+        os.utime(path_entry)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+    return object_result
+
+
+def bool_has_entry(path_dir, string_key):
+    return os.path.isfile(os.path.join(path_dir, string_key + ".pkl"))
+
+
+def write_entry(path_dir, string_key, object_value, int_max_bytes):
+    try:
+        os.makedirs(path_dir, exist_ok=True)
+        # We write to a temporary file first and then rename it, so that other
+        # workers never read a half written entry
+        int_fd, path_tmp = tempfile.mkstemp(dir=path_dir, suffix=".tmp")
+        with os.fdopen(int_fd, "wb") as file_entry:
+            pickle.dump(
+                object_value, file_entry, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(path_tmp, os.path.join(path_dir, string_key + ".pkl"))
+    except OSError:
+        # The disk cache is only an optimization, so a read-only file system
+        # must not break the dashboard
+        return
+
+    _evict_entries(path_dir, int_max_bytes)
+
+
+def _evict_entries(path_dir, int_max_bytes):
+    list_entries = []
+    int_total_size = 0
+    for dir_entry in os.scandir(path_dir):
+        if not dir_entry.name.endswith(".pkl"):
+            continue
+        try:
+            stat_entry = dir_entry.stat()
+        except OSError:
+            continue
+        list_entries.append(
+            (stat_entry.st_mtime, stat_entry.st_size, dir_entry.path)
+        )
+        int_total_size += stat_entry.st_size
+
+    # The least recently used entries are removed first
+    for _, int_size, path_entry in sorted(list_entries):
+        if int_total_size <= int_max_bytes:
+            break
+        try:
+            os.remove(path_entry)
+        except OSError:
+            continue
+        int_total_size -= int_size
+
+
+def clear_entries(path_dir):
+    if not os.path.isdir(path_dir):
+        return
+    for dir_entry in os.scandir(path_dir):
+        if dir_entry.name.endswith(".pkl"):
+            os.remove(dir_entry.path)
+
+
+class SharedCache:
+    # An LRUCache of this process in front of pickled entries in path_dir,
+    # which every process that can see path_dir shares. The keys are tuples
+    # of JSON serializable values, and the directory is bounded by
+    # int_max_bytes
+    def __init__(self, int_max_entries, path_dir, int_max_bytes):
+        self._cache = LRUCache(int_max_entries)
+        self._path_dir = path_dir
+        self._int_max_bytes = int_max_bytes
+
+    @staticmethod
+    def _string_key(tuple_key):
+        return hashlib.sha256(
+            json.dumps(list(tuple_key), default=str).encode()
+        ).hexdigest()
+
+    def get(self, tuple_key, default=None):
+        object_result = self._cache.get(tuple_key)
+        if object_result is not None:
+            return object_result
+
+        object_result = object_read_entry(
+            self._path_dir, self._string_key(tuple_key)
+        )
+        if object_result is None:
+            return default
+        self._cache.set(tuple_key, object_result)
+
+        return object_result
+
+    def set(self, tuple_key, object_value):
+        self._cache.set(tuple_key, object_value)
+        write_entry(
+            self._path_dir,
+            self._string_key(tuple_key),
+            object_value,
+            self._int_max_bytes,
+        )